@@ -0,0 +1,17 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+sphof benchmarks
+================
+
+Run all benchmarks from the root of the repository::
+
+    python3 -m benchmarks
+
+or a selection, writing the results to a file::
+
+    python3 -m benchmarks loop frames --duration 5 --output bench_output.txt
+
+Every result is written as one JSON object per line so results of
+different releases can be compared.
+"""
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import sys
+import json
+import time
+import platform
+import argparse
+import importlib
+import subprocess
+
+SCENARIOS = ["loop", "signals", "frames", "opencv", "philosophers", "startup", "import"]
+
+
+def revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks",
+                                     description="Run the sphof benchmarks")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help="the scenarios to run ({0}), all if none given".format(", ".join(SCENARIOS)))
+    parser.add_argument("--duration", type=float, default=5.,
+                        help="seconds to measure per run")
+    parser.add_argument("--output", help="append the results to this file")
+    args = parser.parse_args(argv)
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            parser.error("unknown scenario: {0}".format(scenario))
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    info = {"revision": revision(), "python": platform.python_version(),
+            "platform": platform.platform(), "time": time.time()}
+    try:
+        for scenario in args.scenarios or SCENARIOS:
+            try:
+                module = importlib.import_module("benchmarks.bench_" + scenario)
+            except ImportError as e:
+                print("Skipping {0}: {1}".format(scenario, e), file=sys.stderr)
+                continue
+            for params in module.SWEEP:
+                result = {"scenario": scenario, "params": params}
+                result.update(info)
+                result["result"] = module.bench(args.duration, **params)
+                out.write(json.dumps(result, sort_keys=True) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
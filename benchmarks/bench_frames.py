@@ -0,0 +1,73 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Frame throughput of PainterActor.send_img -> CanvasActor.get_img_from_id
+"""
+from random import randint
+from sphof import CanvasActor, PainterActor
+from sphof.displays import OffscreenDisplay
+from .common import BenchLeadActor, unique_name, run
+
+SWEEP = [{"actors": n, "width": w, "height": h}
+            for n in (1, 4) for w, h in ((200, 600), (800, 600), (1920, 1080))]
+
+
+class BenchPainter(PainterActor):
+    fps = 0
+    # frames sent before the canvas subscribed are never fetched, without
+    # latest_only they would hold the credits until the registry's ttl
+    latest_only = True
+
+    def setup(self):
+        self.set_width(self.bench_width)
+        self.set_height(self.bench_height)
+
+    def update(self):
+        if self.credits():
+            self.send_img()
+
+    def draw(self):
+        self.line([(randint(0, self.width), randint(0, self.height)),
+                   (randint(0, self.width), randint(0, self.height))], (200, 100, 50), 4)
+
+
+class FrameCanvas(CanvasActor, BenchLeadActor):
+
+    def setup(self):
+        self.register_int("frame_in", 0, "rs")
+        self.images = {}
+        self.received = 0
+        for i in range(self.actor_count):
+            self.add_actor(BenchPainter(unique_name("Painter")))
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        if name.startswith("Painter"):
+            self.signal_subscribe(self.uuid(), "frame_in", peer, "imgID")
+
+    def on_peer_signaled(self, peer, name, data):
+        img = self.get_img_from_id(data[1])
+        if img is not None:
+            self.images[peer] = img
+            self.received += 1
+
+    def draw(self):
+        for i, img in enumerate(self.images.values()):
+            self.draw_img(img, 0, 0, layer=i)
+
+    def snapshot(self):
+        return {"frames": self.received}
+
+
+def bench(duration, actors, width, height):
+    BenchPainter.bench_width = width
+    BenchPainter.bench_height = height
+    FrameCanvas.actor_count = actors
+    FrameCanvas.duration = duration
+    lead = run(FrameCanvas(unique_name("FrameCanvas"), display=OffscreenDisplay(width, height)))
+    frames = lead.rates().get("frames", 0.)
+    if not frames:
+        raise RuntimeError("{0} received no frames".format(lead.name()))
+    return {
+        "frames_per_second": frames,
+        "megabytes_per_second": frames * width * height * 3 / 1e6,
+    }
@@ -0,0 +1,40 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Startup cost of importing sphof in a fresh interpreter, as paid by every
+worker process
+"""
+import sys
+import json
+import time
+import subprocess
+from sphof.metrics import Histogram
+
+SWEEP = [{"names": names} for names in ("", "Actor", "PhilosopherActor", "CanvasActor")]
+
+_SCRIPT = """
+import sys, time, json
+t = time.perf_counter()
+import sphof
+{0}
+t = time.perf_counter() - t
+print(json.dumps({{"seconds": t, "modules": len(sys.modules),
+                  "tkinter": "tkinter" in sys.modules, "PIL": "PIL" in sys.modules}}))
+"""
+
+
+def bench(duration, names):
+    script = _SCRIPT.format("from sphof import " + names if names else "")
+    imports = Histogram()
+    spawns = Histogram()
+    end = time.monotonic() + duration
+    result = {}
+    while time.monotonic() < end or not imports.count:
+        t = time.perf_counter()
+        out = subprocess.check_output([sys.executable, "-c", script])
+        spawns.record(time.perf_counter() - t)
+        result = json.loads(out.decode().strip().splitlines()[-1])
+        imports.record(result.pop("seconds"))
+    result.update(("import_" + key, value) for key, value in imports.to_dict().items())
+    result["process_mean"] = spawns.mean()
+    return result
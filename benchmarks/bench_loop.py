@@ -0,0 +1,58 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Loop overhead of empty actors running unthrottled
+"""
+from sphof import Actor
+from sphof.pool import PooledActor
+from .common import BenchLeadActor, unique_name, run
+
+SWEEP = [{"actors": n} for n in (1, 4, 16)] + \
+        [{"actors": n, "pooled": True} for n in (16, 256)]
+
+
+class EmptyActor(Actor):
+    fps = 0
+
+    def setup(self):
+        return
+
+    def update(self):
+        return
+
+
+class EmptyPooledActor(PooledActor):
+    fps = 0
+
+    def setup(self):
+        return
+
+    def update(self):
+        return
+
+
+class LoopLead(BenchLeadActor):
+    actor_class = EmptyActor
+
+    def setup(self):
+        for i in range(self.actor_count):
+            self.add_actor(self.actor_class(unique_name("Empty")))
+
+    def snapshot(self):
+        return {"loops": sum(act.metrics.histograms["frame"].count
+                             for act in self.actors if "frame" in act.metrics.histograms)}
+
+
+def bench(duration, actors, pooled=False):
+    # pooled actors run on the LeadActor's pool instead of a thread each
+    LoopLead.actor_class = EmptyPooledActor if pooled else EmptyActor
+    LoopLead.actor_count = actors
+    LoopLead.duration = duration
+    lead = run(LoopLead(unique_name("LoopLead")))
+    rates = lead.rates()
+    loops = rates.get("loops", 0.)
+    return {
+        "loops_per_second": loops,
+        "loops_per_second_per_actor": loops / actors,
+        "us_per_loop": 1e6 * actors / loops if loops else None,
+    }
@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+The opencv.py filter chain fed by a synthetic source
+"""
+import time
+import numpy as np
+import sphof
+from sphof import LeadActor
+from sphof.frames import FrameMeta
+from sphof.metrics import LatencyTracker
+from opencv import CVCapLeadActor, OpenCVActor, BlurActor, InvertActor
+from .common import BenchLeadActor, unique_name, run
+
+SWEEP = [{"width": w, "height": h} for w, h in ((320, 240), (640, 480), (1280, 720))]
+
+
+class SyntheticCVLead(CVCapLeadActor, BenchLeadActor):
+
+    def setup(self):
+        width, height = self.frame_size
+        self.source = np.random.randint(0, 255, (height, width, 3), np.uint8)
+        self.results = 0
+        self.seq = 0
+        self.latency = LatencyTracker(self.metrics)
+        self.shown = []
+        # same as CVCapLeadActor without the camera and window
+        self.add_actor(OpenCVActor("CVActor"))
+        self.add_actor(BlurActor("BlurActor"))
+        self.add_actor(InvertActor("InvertActor"))
+        self.thumb = None
+        self.blur = None
+        self.invert = None
+        self.register_int("imgID_out", 0, "re")
+        self.register_int("thumb_in", 0, "rs")
+        self.register_int("blur_in", 0, "rs")
+        self.register_int("invert_in", 0, "rs")
+
+    def update(self):
+        self.cap_success, self.frame = True, self.source.copy()
+        self.seq += 1
+        self.send_img(self.frame, "imgID_out", FrameMeta(self.name(), self.seq))
+
+    def draw(self):
+        now = time.monotonic()
+        for meta in self.shown:
+            self.latency.record(meta, "display", now)
+        del self.shown[:]
+
+    def on_peer_signaled(self, peer, name, data):
+        super(SyntheticCVLead, self).on_peer_signaled(peer, name, data)
+        self.results += 1
+
+    def snapshot(self):
+        return {"results": self.results}
+
+    def stop(self):
+        LeadActor.stop(self)
+
+
+def bench(duration, width, height):
+    SyntheticCVLead.frame_size = (width, height)
+    SyntheticCVLead.duration = duration
+    hits, misses = sphof.shared_ns.derived_hits, sphof.shared_ns.derived_misses
+    lead = run(SyntheticCVLead(unique_name("CVCaptureActor")))
+    latency = lead.latency.to_dict().get(lead.name(), {}).get("total", {})
+    return {
+        "filtered_frames_per_second": lead.rates().get("results", 0.),
+        # the filters share one resize per frame
+        "resizes_shared": sphof.shared_ns.derived_hits - hits,
+        "resizes_computed": sphof.shared_ns.derived_misses - misses,
+        # from the new frame to the filtered thumbs being drawn
+        "latency_p50_ms": latency.get("p50", 0.) * 1000,
+        "latency_p99_ms": latency.get("p99", 0.) * 1000,
+    }
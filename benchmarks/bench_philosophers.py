@@ -0,0 +1,46 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Meals per second of the dining philosophers
+"""
+from sphof.philosopher_actors import Waiter, DiningPhilosopherActor, PooledPhilosopherActor
+from .common import BenchLeadActor, unique_name, run
+
+SWEEP = [{"seats": 5, "policy": "fair"}] + \
+        [{"seats": n, "policy": policy, "pooled": True}
+            for n in (100, 5000) for policy in ("fair", "greedy")]
+
+
+# unthrottled with a small appetite so the waiter is the bottleneck
+class BenchPhilosopher(DiningPhilosopherActor):
+    fps = 0
+    appetite = 1
+
+
+class BenchPooledPhilosopher(PooledPhilosopherActor):
+    fps = 0
+    appetite = 1
+
+
+class BenchWaiter(Waiter, BenchLeadActor):
+
+    def update(self):
+        return
+
+    def snapshot(self):
+        return {"meals": self.table.grants}
+
+
+def bench(duration, seats, policy, pooled=False):
+    BenchWaiter.seats = seats
+    BenchWaiter.policy = policy
+    BenchWaiter.philosopher_class = BenchPooledPhilosopher if pooled else BenchPhilosopher
+    BenchWaiter.duration = duration
+    lead = run(BenchWaiter(unique_name("Waiter")))
+    stats = lead.table.stats()
+    return {
+        "meals_per_second": lead.rates().get("meals", 0.),
+        # the spread shows how fair the table is
+        "min_meals": stats["min_meals"],
+        "max_meals": stats["max_meals"],
+    }
@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Round trip latency of emit_signal -> on_peer_signaled -> emit_signal
+"""
+import time
+from sphof import Actor
+from sphof.metrics import Histogram
+from .common import BenchLeadActor, unique_name, run
+
+SWEEP = [{"actors": n, "local": local} for n in (1, 4, 16) for local in (True, False)]
+
+
+class PongActor(Actor):
+    fps = 0
+
+    def setup(self):
+        self.register_float("ping_in", 0., "rs")
+        self.register_float("pong", 0., "re")
+
+    def update(self):
+        return
+
+    def on_peer_signaled(self, peer, name, data):
+        self.emit_signal("pong", data[1])
+
+
+class PingLead(BenchLeadActor):
+
+    def setup(self):
+        self.register_float("ping", 0., "re")
+        self.register_float("pong_in", 0., "rs")
+        self.rtt = Histogram()
+        self.pending = {}               # peer : ping value
+        self.subscribed = set()
+        for i in range(self.actor_count):
+            self.add_actor(PongActor(unique_name("Pong")))
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        if name.startswith("Pong"):
+            self.signal_subscribe(peer, "ping_in", self.uuid(), "ping")
+            self.signal_subscribe(self.uuid(), "pong_in", peer, "pong")
+            self.subscribed.add(peer)
+
+    def on_peer_signaled(self, peer, name, data):
+        sent = self.pending.pop(peer, None)
+        if sent is not None and sent == data[1]:
+            if self.first:
+                self.rtt.record(time.perf_counter() - sent)
+
+    def update(self):
+        # send the next ping when all pongs have answered (or after 1s)
+        if not self.subscribed:
+            return
+        now = time.perf_counter()
+        if not self.pending or now - next(iter(self.pending.values())) > 1.:
+            self.pending = dict((peer, now) for peer in self.subscribed)
+            self.emit_signal("ping", now)
+
+    def snapshot(self):
+        return {"pongs": self.rtt.count}
+
+
+def bench(duration, actors, local=True):
+    # local routes the signals through the in-process bus, otherwise ZOCP
+    PongActor.local_transport = PingLead.local_transport = local
+    PingLead.actor_count = actors
+    PingLead.duration = duration
+    lead = run(PingLead(unique_name("PingLead")))
+    result = dict(("rtt_" + key, value) for key, value in lead.rtt.to_dict().items())
+    result["pongs_per_second"] = lead.rates().get("pongs", 0.)
+    return result
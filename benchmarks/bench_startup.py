@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Time from creating a LeadActor until every Actor it adds is wired and
+has delivered its first signal
+"""
+import time
+from sphof import Actor
+from .common import BenchLeadActor, unique_name, run
+
+SWEEP = [{"actors": n, "local": local} for n in (1, 8, 32) for local in (True, False)]
+
+
+class HelloActor(Actor):
+
+    def setup(self):
+        self.register_int("hello", 0, "re")
+
+    def update(self):
+        self.emit_signal("hello", self.get_value("hello") + 1)
+
+
+class StartupLead(BenchLeadActor):
+    warmup = 0
+
+    def __init__(self, *args, **kwargs):
+        self.created = time.perf_counter()
+        self.entered = None
+        self.wired = None
+        self.greeted = set()
+        super(StartupLead, self).__init__(*args, **kwargs)
+
+    def setup(self):
+        self.register_int("hello_in", 0, "rs")
+        for i in range(self.actor_count):
+            self.add_actor(HelloActor(unique_name("Hello")))
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        if name.startswith("Hello"):
+            self.signal_subscribe(self.uuid(), "hello_in", peer, "hello")
+
+    def on_peer_signaled(self, peer, name, data):
+        self.greeted.add(peer)
+        if len(self.greeted) == self.actor_count and self.wired is None:
+            self.wired = time.perf_counter() - self.created
+            self._running = False
+
+    def update(self):
+        return
+
+
+def bench(duration, actors, local=True):
+    HelloActor.local_transport = StartupLead.local_transport = local
+    StartupLead.actor_count = actors
+    StartupLead.duration = duration     # give up after duration seconds
+    lead = run(StartupLead(unique_name("StartupLead")))
+    return {"wired": lead.wired, "greeted": len(lead.greeted)}
@@ -0,0 +1,74 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import itertools
+from sphof import LeadActor
+
+_names = itertools.count(1)
+
+
+def unique_name(prefix):
+    """
+    Returns a node name which is unique within this process
+    """
+    return "{0}{1}".format(prefix, next(_names))
+
+
+class BenchLeadActor(LeadActor):
+    """
+    A LeadActor which stops itself after warmup + duration seconds.
+
+    Subclasses call :py:meth:`snapshot` to get the values measured,
+    which is called once at the end of the warmup and once at the end.
+    """
+    fps = 0
+    warmup = 1.0
+    duration = 5.0
+
+    def __init__(self, *args, **kwargs):
+        self.started = time.monotonic()
+        self.first = None
+        self.last = None
+        super(BenchLeadActor, self).__init__(*args, **kwargs)
+
+    def snapshot(self):
+        return {}
+
+    def post_update(self):
+        self.check_actors()
+        now = time.monotonic()
+        if self.first is None and now > self.started + self.warmup:
+            self.first = (now, self.snapshot())
+        elif self.first and now > self.first[0] + self.duration:
+            self.last = (now, self.snapshot())
+            self._running = False
+
+    def check_actors(self):
+        """
+        Raises a RuntimeError if the thread of an added actor died, the
+        measurements would be meaningless
+        """
+        for actor in self.actors:
+            thread = getattr(actor, "thread", None)
+            if thread is not None and not thread.is_alive():
+                raise RuntimeError("{0}: thread of {1} died".format(self.name(), actor.name()))
+
+    def rates(self):
+        """
+        Returns the measured values per second between the snapshots
+        """
+        if not self.last:
+            return {}
+        elapsed = self.last[0] - self.first[0]
+        return dict((key, (self.last[1][key] - self.first[1].get(key, 0)) / elapsed)
+                            for key in self.last[1])
+
+
+def run(lead):
+    """
+    Run the lead actor until it stops itself and return it
+    """
+    lead.run()
+    if not lead.last:
+        raise RuntimeError("{0} stopped before the measurement finished".format(lead.name()))
+    return lead
@@ -9,7 +9,7 @@ class MyPainter(PainterActor):
 
     def update(self):
         self.count += 1
-        if self.count > 60 and len(sphof.shared_ns) < 8:
+        if self.count > 60 and self.credits():
             self.send_img()
             self.count = 0
 
@@ -1,25 +1,34 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import sys
+import time
+import logging
 import sphof
-from sphof import LeadActor, Actor
+from sphof import LeadActor, ReactiveActor
+from sphof.capture import CaptureSource
+from sphof.frames import FrameMeta
+from sphof.metrics import LatencyTracker
 import cv2
 import numpy as np
 
-class OpenCVActor(Actor):
+logger = logging.getLogger(__name__)
+
+
+class OpenCVActor(ReactiveActor):
 
     def setup(self):
         self.register_int("img_in", 0, "rs")
         self.register_int("img_out", 0, "re")
         
-    def send_img(self, img, ID):
+    def send_img(self, img, ID, meta=None):
         """
         Sends the image as a signal to any subscribers using the 'imgID'
         emitter. The canvas is reset after the image is sent!
         """
-        imgID = id(img)
-        assert(imgID not in sphof.shared_ns)
-        sphof.shared_ns[imgID] = img
+        if meta is not None:
+            meta = meta.hop(self.name())
+        imgID = sphof.shared_ns.put(img, meta=meta)
         self.emit_signal(ID, imgID)
     
     def get_img_from_id(self, imgID):
@@ -29,9 +38,23 @@ class OpenCVActor(Actor):
         try:
             return sphof.shared_ns.pop(imgID)
         except KeyError:
-            print("Key Error", sphof.shared_ns.keys())
+            logger.warning("Image {0} not available".format(imgID))
             return None
 
+    def get_thumb(self, imgID, width, height):
+        """
+        Get the image of the given imgID resized. The resized image is
+        computed once per frame and shared with the other filter actors
+        so don't modify it or send it on, send a copy.
+        """
+        try:
+            return sphof.shared_ns.derive(imgID, "resize", self.resize, width, height)
+        except KeyError:
+            logger.warning("Image {0} not available".format(imgID))
+            return None
+        finally:
+            sphof.shared_ns.release(imgID)
+
     def resize(self, img, width, height):
         return cv2.resize(img, (width, height))
         
@@ -47,70 +70,52 @@ class OpenCVActor(Actor):
 
     def on_peer_signaled(self, peer, name, data):
         imgID = self.get_value("img_in")
-        img = self.get_img_from_id(imgID)
-        if img == None:
-            print(data)
+        meta = sphof.shared_ns.info(imgID)
+        img_s = self.get_thumb(imgID, 120, 90)
+        if img_s is None:
             return
-        img_s = self.resize(img, 120, 90)
-        self.send_img(img_s, "img_out")
+        # the thumb is cached with the frame, the receiver gets its own
+        self.send_img(img_s.copy(), "img_out", meta)
 
 
 class InvertActor(OpenCVActor):
     
     def on_peer_signaled(self, peer, name, data):
         imgID = self.get_value("img_in")
-        img = self.get_img_from_id(imgID)
-        if img == None:
-            print(data)
+        meta = sphof.shared_ns.info(imgID)
+        img_s = self.get_thumb(imgID, 120, 90)
+        if img_s is None:
             return
-        img_s = self.resize(img, 120, 90)
         img_s = self.invert(img_s)
-        self.send_img(img_s, "img_out")    
-
-    def get_img_from_id(self, imgID):
-        """
-        Get the image from the given imgID
-        """
-        try:
-            return sphof.shared_ns.pop(hex(imgID))
-        except KeyError:
-            print("Key Error", sphof.shared_ns.keys())
-            return None
+        self.send_img(img_s, "img_out", meta)    
 
 
 class BlurActor(OpenCVActor):
     
     def on_peer_signaled(self, peer, name, data):
         imgID = self.get_value("img_in")
-        img = self.get_img_from_id(imgID)
-        if img == None:
-            print(data)
+        meta = sphof.shared_ns.info(imgID)
+        img_s = self.get_thumb(imgID, 120, 90)
+        if img_s is None:
             return
-        img_s = self.resize(img, 120, 90)
         img_s = self.blur(img_s)
-        self.send_img(img_s, "img_out")    
-
-    def get_img_from_id(self, imgID):
-        """
-        Get the image from the given imgID
-        """
-        try:
-            return sphof.shared_ns.pop(str(imgID))
-        except KeyError:
-            print("Key Error", sphof.shared_ns.keys())
-            return None
+        self.send_img(img_s, "img_out", meta)    
 
 
 class CVCapLeadActor(LeadActor):
+    # a camera index, a video file or 'synthetic'
+    capture_source = 0
 
     def setup(self):
         self.add_actor(OpenCVActor("CVActor"))
         self.add_actor(BlurActor("BlurActor"))
         self.add_actor(InvertActor("InvertActor"))
-        self.video_capture = cv2.VideoCapture(0)
-        #self.video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, 320)
-        #self.video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)
-        #self.video_capture.set(cv2.CAP_PROP_FPS, 15)
+        # the camera is read on its own thread so its jitter doesn't
+        # stall our loop
+        self.capture = CaptureSource(self.capture_source).start()
+        self.seq = 0
+        self.latency = LatencyTracker(self.metrics)
+        self.shown = []                 # meta of the thumbs to show
         self.frame = None
         self.thumb = None
         self.blur = None
@@ -124,29 +129,38 @@ class CVCapLeadActor(LeadActor):
         self.cap_success = False
     
     def update(self):
-        self.cap_success, self.frame = self.video_capture.read()
+        captured = self.capture.latest(after=self.seq)
+        self.cap_success = captured.image is not None
         if self.cap_success:
-            self.send_img(self.frame, "imgID_out")
-            if self.thumb != None:
+            self.seq = captured.seq
+            self.frame = captured.image
+            meta = FrameMeta(self.name(), captured.seq, captured.timestamp)
+            self.send_img(self.frame.copy(), "imgID_out", meta)
+            if self.thumb is not None:
                 self.frame[0:90, 0:120] = self.thumb
-            if self.blur != None:
+            if self.blur is not None:
                 self.frame[90:180, 0:120] = self.blur
-            if self.invert != None:
+            if self.invert is not None:
                 self.frame[180:270, 0:120] = self.invert
     
     def draw(self):
         if self.cap_success:
             cv2.imshow('Video', self.frame)
+            # capture to display latency of the thumbs shown
+            now = time.monotonic()
+            for meta in self.shown:
+                self.latency.record(meta, "display", now)
+            del self.shown[:]
     
-    def send_img(self, img, ID):
+    def send_img(self, img, ID, meta=None):
         """
         Sends the image as a signal to any subscribers using the 'imgID'
         emitter. The canvas is reset after the image is sent!
         """
-        imgID = id(img)
-        sphof.shared_ns[imgID] = img
-        sphof.shared_ns[str(imgID)] = img
-        sphof.shared_ns[hex(imgID)] = img
+        # every filter actor receives the image
+        if meta is not None:
+            meta = meta.hop(self.name())
+        imgID = sphof.shared_ns.put(img, len(self.actors), meta=meta)
         self.emit_signal(ID, imgID)
     
     def on_peer_enter(self, peer, name, headers):
@@ -160,20 +174,28 @@ class CVCapLeadActor(LeadActor):
             self.signal_subscribe(self.uuid(), "invert_in", peer, "img_out")
             self.signal_subscribe(peer, "img_in", self.uuid(), "imgID_out")
     
-    def on_peer_signaled(self, peer, name, date):
+    def on_peer_signaled(self, peer, name, data):
+        meta = sphof.shared_ns.info(data[1])
+        if meta is not None:
+            self.shown.append(meta)
         if name == "CVActor":
-            self.thumb = sphof.shared_ns.pop(self.get_value('thumb_in'))
+            self.thumb = sphof.shared_ns.pop(self.get_value('thumb_in'), self.thumb)
         if name == "BlurActor":
-            self.blur = sphof.shared_ns.pop(self.get_value('blur_in'))
+            self.blur = sphof.shared_ns.pop(self.get_value('blur_in'), self.blur)
         if name == "InvertActor":
-            self.invert = sphof.shared_ns.pop(self.get_value('invert_in'))
+            self.invert = sphof.shared_ns.pop(self.get_value('invert_in'), self.invert)
 
     def stop(self):
-        self.video_capture.release()
+        self.capture.stop()
+        print("capture:", self.capture.stats())
+        for source in self.latency.sources():
+            print(self.latency.summary(source))
         cv2.destroyAllWindows()
         super(CVCapLeadActor, self).stop()
         
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        CVCapLeadActor.capture_source = sys.argv[1]
     lead_actor = CVCapLeadActor("CVCaptureActor")
     lead_actor.run()
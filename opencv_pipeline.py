@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import sphof
+from sphof import LeadActor
+from sphof.capture import CaptureSource
+from sphof.frames import FrameMeta
+from sphof.metrics import LatencyTracker
+from sphof.pipeline import PipelineActor
+import cv2
+
+
+class Filters(PipelineActor):
+    # resize → blur and invert, add stages here instead of actors
+    pipeline = [
+        {"name": "thumb", "op": "resize", "params": {"width": 120, "height": 90}},
+        {"name": "blur", "op": "blur", "inputs": ["thumb"]},
+        {"name": "invert", "op": "invert", "inputs": ["thumb"]},
+        {"name": "mix", "op": "blend", "inputs": ["blur", "invert"]},
+    ]
+    outputs = ("thumb", "blur", "invert", "mix")
+
+
+class CVPipelineLeadActor(LeadActor):
+    # a camera index, a video file or 'synthetic'
+    capture_source = 0
+
+    def setup(self):
+        self.capture = CaptureSource(self.capture_source).start()
+        self.seq = 0
+        self.latency = LatencyTracker(self.metrics)
+        self.shown = []                 # meta of the thumbs to show
+        self.frame = None
+        self.thumbs = dict((name, None) for name in Filters.outputs)
+        self.register_int("imgID_out", 0, "re")
+        for name in Filters.outputs:
+            self.register_int(name + "_in", 0, "rs")
+        cv2.startWindowThread()
+        cv2.namedWindow('Video')
+        self.cap_success = False
+        self.add_actor(Filters("Filters"))
+
+    def update(self):
+        captured = self.capture.latest(after=self.seq)
+        self.cap_success = captured.image is not None
+        if self.cap_success:
+            self.seq = captured.seq
+            self.frame = captured.image
+            meta = FrameMeta(self.name(), captured.seq, captured.timestamp).hop(self.name())
+            # the thumbs are drawn into self.frame, the filters get a copy
+            self.emit_signal("imgID_out", sphof.shared_ns.put(self.frame.copy(), meta=meta))
+            for i, name in enumerate(Filters.outputs):
+                thumb = self.thumbs[name]
+                if thumb is not None:
+                    self.frame[i*90:(i+1)*90, 0:120] = thumb
+
+    def draw(self):
+        if self.cap_success:
+            cv2.imshow('Video', self.frame)
+            now = time.monotonic()
+            for meta in self.shown:
+                self.latency.record(meta, "display", now)
+            del self.shown[:]
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        if name == "Filters":
+            self.signal_subscribe(peer, "img_in", self.uuid(), "imgID_out")
+            for output in Filters.outputs:
+                self.signal_subscribe(self.uuid(), output + "_in", peer, output)
+
+    def on_peer_signaled(self, peer, name, data):
+        if name == "Filters":
+            meta = sphof.shared_ns.info(data[1])
+            if meta is not None:
+                self.shown.append(meta)
+            self.thumbs[data[0]] = sphof.shared_ns.pop(data[1], self.thumbs[data[0]])
+
+    def stop(self):
+        self.capture.stop()
+        for source in self.latency.sources():
+            print(self.latency.summary(source))
+        cv2.destroyAllWindows()
+        super(CVPipelineLeadActor, self).stop()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        CVPipelineLeadActor.capture_source = sys.argv[1]
+    lead_actor = CVPipelineLeadActor("CVPipelineActor")
+    lead_actor.run()
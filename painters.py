@@ -59,16 +59,16 @@ class Painters(CanvasActor):
         #logger.warning("ZOCP PEER SIGNALED: %s modified %s" %(name, data))
         if name == "Thread1":
             imgID = data[1]
-            self.painter_images[0] = self.get_img_from_id(imgID)
+            self.painter_images[0] = self.get_img_from_id(imgID) or self.painter_images[0]
         elif name == "Thread2":
             imgID = data[1]
-            self.painter_images[1] = self.get_img_from_id(imgID)
+            self.painter_images[1] = self.get_img_from_id(imgID) or self.painter_images[1]
         elif name == "Thread3":
             imgID = data[1]
-            self.painter_images[2] = self.get_img_from_id(imgID)
+            self.painter_images[2] = self.get_img_from_id(imgID) or self.painter_images[2]
         elif name == "Thread4":
             imgID = data[1]
-            self.painter_images[3] = self.get_img_from_id(imgID)
+            self.painter_images[3] = self.get_img_from_id(imgID) or self.painter_images[3]
 
     def draw(self):
         for i, img in enumerate(self.painter_images):
@@ -1,16 +1,60 @@
-#!/usr/bin/python 
+#!/usr/bin/python
 # -*- coding: utf-8 -*-
 #__all__ = ['canvas_actors']
 #__all__ = ['pyre', 'zbeacon', 'zhelper']
+import importlib
 
-from .actors import LoneActor, LeadActor, Actor
-from .canvas_actors import CanvasActor, PainterActor, LonePainterActor, Painter
-from .philosopher_actors import PhilosopherActor, LonePhilosopherActor
+from .frames import FrameRegistry
+
+shared_ns = FrameRegistry() # this is the shared namespace used for passing
+                            # frames between Actors in this process
+                            # handle : frame
+
+# The actor classes are imported when they are first used so a headless
+# actor doesn't load tkinter, PIL or asyncio. name : module
+_lazy = {
+    "LoneActor": ".actors",
+    "LeadActor": ".actors",
+    "Actor": ".actors",
+    "ReactiveActor": ".actors",
+    "CanvasActor": ".canvas_actors",
+    "PainterActor": ".canvas_actors",
+    "LonePainterActor": ".canvas_actors",
+    "Painter": ".canvas_actors",
+    "NumpyPainter": ".canvas_actors",
+    "NumpyPainterActor": ".canvas_actors",
+    "PhilosopherActor": ".philosopher_actors",
+    "LonePhilosopherActor": ".philosopher_actors",
+    "DiningPhilosopherActor": ".philosopher_actors",
+    "PooledPhilosopherActor": ".philosopher_actors",
+    "PhilosopherTable": ".philosopher_table",
+    "Waiter": ".philosopher_actors",
+    "ProcessActor": ".process_actors",
+    "ProcessPainterActor": ".process_actors",
+    "ActorPool": ".pool",
+    "PooledActor": ".pool",
+    "AsyncActor": ".aio",
+    "AsyncLeadActor": ".aio",
+    "Pipeline": ".pipeline",
+    "PipelineActor": ".pipeline",
+    "CaptureSource": ".capture",
+}
+
+__all__ = ["shared_ns", "FrameRegistry"] + list(_lazy)
+
+
+def __getattr__(name):
+    module = _lazy.get(name)
+    if module is None:
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy))
 
-shared_ns = {}      # this is the shared namespace used for passing pointers
-                    # id(var) : var
-                    # this works for multiple threads because of the GIL
-                    # otherwise use one ns per thread
 #__license__ = "Cecill-C"
 #__revision__ = " $Id: actor.py 1586 2009-01-30 15:56:25Z cokelaer $ "
 #__docformat__ = 'reStructuredText'
@@ -1,9 +1,16 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 import time
+import math
+import heapq
 import logging
+import itertools
 import threading
+import zmq
 from zocp import ZOCP
+from .schedulers import make_scheduler
+from .metrics import ActorMetrics
+from .local_bus import local_bus, LocalInbox, ENTER, EXIT
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +24,52 @@ Package Example (:mod:`actors`)
 
    LoneActor
    Actor
+   ReactiveActor
    LeadActor
 """
 
+
+def _run_frame(actor, updates):
+    """
+    Run the update and draw methods of the actor for one frame and
+    record their durations in the actor's metrics
+    """
+    clock = time.perf_counter
+    record = actor.metrics.record
+    start = clock()
+    for i in range(updates):
+        t0 = clock()
+        actor.pre_update()
+        t1 = clock()
+        actor.update()
+        t2 = clock()
+        actor.post_update()
+        t3 = clock()
+        record("pre_update", t1 - t0)
+        record("update", t2 - t1)
+        record("post_update", t3 - t2)
+    t0 = clock()
+    actor.pre_draw()
+    t1 = clock()
+    actor.draw()
+    t2 = clock()
+    actor.post_draw()
+    t3 = clock()
+    record("pre_draw", t1 - t0)
+    record("draw", t2 - t1)
+    record("post_draw", t3 - t2)
+    record("frame", t3 - start)
+
+
+def _report_metrics(actor):
+    """
+    Print the actor's metrics and write them to its metrics_file
+    """
+    actor.metrics.gauge("missed", actor.scheduler.missed)
+    print("{0}: {1}".format(actor.name(), actor.metrics.summary()))
+    if actor.metrics_file:
+        actor.metrics.dump(actor.metrics_file)
+
 class LoneActor(object):
     """
     The LoneActor class runs an application loop.
@@ -33,9 +83,22 @@ class LoneActor(object):
     * Use :py:meth:`.LoneActor.update` method to update anything you\
     have setup
     * Use :py:meth:`.LoneActor.draw` method to visualise
+
+    Use the :py:meth:`.LoneActor.set_fps` method to change the rate of the
+    loop.
+
+    The performance of the actor is recorded in its metrics attribute,
+    see :py:class:`sphof.metrics.ActorMetrics`.
     """    
+    fps = 60.
+    frame_policy = "skip"
+    metrics_interval = 60
+    metrics_file = None
+
     def __init__(self, name, *args, **kwargs):
         self._name = name
+        self.scheduler = make_scheduler(self.fps, self.frame_policy)
+        self.metrics = ActorMetrics()
         super(LoneActor, self).__init__(*args, **kwargs)
         self.setup()
         
@@ -85,35 +148,34 @@ class LoneActor(object):
     def name(self):
         return self._name
 
+    def set_fps(self, fps, policy=None):
+        """
+        Set the rate of the loop
+
+        :param float fps: Frames per second, 0 runs the loop as fast as possible
+        :param str policy: 'skip' or 'catchup', what to do when frames are missed. See :py:class:`sphof.schedulers.FrameScheduler`
+        """
+        self.fps = fps
+        if policy:
+            self.frame_policy = policy
+        # the loop may be running, the new scheduler continues from now
+        self.scheduler = make_scheduler(self.fps, self.frame_policy, self.scheduler)
+
     def run(self):
         self._running = True
-        count = 0
-        t = time.time()
+        report_at = time.monotonic() + self.metrics_interval
         try:
-            reap_at = time.time() + 1/60.
+            self.scheduler.start()
             while self._running:
-                timeout = reap_at - time.time()
+                timeout = self.scheduler.timeout()
                 if timeout > 0:
-                    #timeout = 0
                     time.sleep(timeout)
-                else:
-                    logger.debug("Can't do 60 fps")
-                #self.run_once(0) #timeout * 1000)
-                reap_at = time.time() + 1/60.
-
-                self.pre_update()
-                self.update()
-                self.post_update()
-
-                self.pre_draw()
-                self.draw()
-                self.post_draw()
-                
-                count += 1
-                if t + 60 < time.time():
-                    print("{0}: fps: {1}".format(self.name(), (time.time() - t)/count))
-                    t = time.time()
-                    count = 0
+                _run_frame(self, self.scheduler.advance())
+
+                # stats
+                if report_at < time.monotonic():
+                    _report_metrics(self)
+                    report_at = time.monotonic() + self.metrics_interval
         except (KeyboardInterrupt, SystemExit) as e:
             print(e)
 
@@ -144,9 +206,38 @@ class Actor(ZOCP):
         example you cannot visualize directly from an Actor. To 
         visualize what an actor draws you'll need to handover the image 
         to a LeadActor.
+
+    Use the :py:meth:`.Actor.set_fps` method to change the rate of the
+    loop.
+
+    The performance of the actor is recorded in its metrics attribute,
+    see :py:class:`sphof.metrics.ActorMetrics`.
+
+    Signals between actors running in the same process don't go
+    through the network. Subscriptions between them are recorded on the
+    :py:class:`sphof.local_bus.LocalBus` and their signals are queued
+    directly in the receiving actor. Set local_transport to False to
+    use ZOCP for everything.
     """
+    _metrics_registered = False
+    _local_inbox = None
+    _local_subscribers = {}     # emitter : ((actor, receiver), ...)
+    _poller = None
+    fps = 60.
+    frame_policy = "skip"
+    metrics_interval = 10
+    metrics_file = None
+    metrics_capability = False
+    local_transport = True
+
     def __init__(self, *args, **kwargs):
+        self.scheduler = make_scheduler(self.fps, self.frame_policy)
+        self.metrics = ActorMetrics()
         super(Actor, self).__init__(*args, **kwargs)
+        if self.local_transport:
+            self._local_peer = (self.uuid(), self.name())
+            self._local_inbox = LocalInbox()
+            local_bus.register(self)
         self.setup()
         self.start()
     
@@ -199,50 +290,241 @@ class Actor(ZOCP):
     
     def post_draw(self):
         return
-        
+
+    def set_fps(self, fps, policy=None):
+        """
+        Set the rate of the loop
+
+        :param float fps: Frames per second, 0 runs the loop as fast as possible
+        :param str policy: 'skip' or 'catchup', what to do when frames are missed. See :py:class:`sphof.schedulers.FrameScheduler`
+        """
+        self.fps = fps
+        if policy:
+            self.frame_policy = policy
+        # the loop may be running, the new scheduler continues from now
+        self.scheduler = make_scheduler(self.fps, self.frame_policy, self.scheduler)
+
     def run(self):
         """
         Run the actor's application loop
         """
         self._running = True
-        t = time.time()
-        count = 0
+        report_at = time.monotonic() + self.metrics_interval
         try:
-            reap_at = time.time() + 1/60.
+            self.scheduler.start()
             while self._running:
-                timeout = reap_at - time.time()
-                if timeout < 0.01:
-                    timeout = 0
-                    self.pre_update()
-                    self.update()
-                    self.post_update()
-
-                    self.pre_draw()
-                    self.draw()
-                    self.post_draw()
-                    count += 1
-
-                # set next interval
-                reap_at = time.time() + 1/60.
-                self.run_once(timeout * 1000)   # parse ZOCP queue
+                if self.scheduler.due():
+                    _run_frame(self, self.scheduler.advance())
+
+                # wait for the next frame
+                timeout = self.scheduler.timeout()
+                t = time.perf_counter()
+                self.run_once(math.ceil(timeout * 1000))   # parse ZOCP queue
+                self.metrics.record("run_once", time.perf_counter() - t)
 
                 # stats
-                if t + 10 < time.time():
-                    print("{0}: fps: {1}".format(self.name(), count/(time.time() - t)))
-                    t = time.time()
-                    count = 0
+                if report_at < time.monotonic():
+                    self.report_metrics()
+                    report_at = time.monotonic() + self.metrics_interval
 
         except (KeyboardInterrupt, SystemExit) as e:
             logger.warning("Actor {0} finished. Exception:{1}".format(self.name(), e))
         finally:
             self._running = False
             self.stop()
+            self._teardown()
         logger.warning("Actor {0} finished.".format(self.name()))
     
+    def signal_subscribe(self, recv_peer, receiver, emit_peer, emitter):
+        """
+        Subscribe the receiver of recv_peer to the emitter of emit_peer.
+        If both peers run in this process the subscription is local.
+        """
+        if not local_bus.subscribe_peers(recv_peer, receiver, emit_peer, emitter):
+            return ZOCP.signal_subscribe(self, recv_peer, receiver, emit_peer, emitter)
+
+    def signal_unsubscribe(self, recv_peer, receiver, emit_peer, emitter):
+        if not local_bus.unsubscribe_peers(recv_peer, receiver, emit_peer, emitter):
+            return ZOCP.signal_unsubscribe(self, recv_peer, receiver, emit_peer, emitter)
+
+    def emit_signal(self, emitter, value):
+        ZOCP.emit_signal(self, emitter, value)
+        if self._local_subscribers:
+            local_bus.emit(self, emitter, value)
+
+    def run_once(self, timeout=None):
+        """
+        Handle the signals received, waits at most timeout milliseconds
+        for a signal
+        """
+        inbox = self._local_inbox
+        if inbox is None:
+            return ZOCP.run_once(self, timeout)
+        if not len(inbox):
+            if self._poller is None:
+                self._poller = zmq.Poller()
+                self._poller.register(self.socket(), zmq.POLLIN)
+                self._poller.register(inbox, zmq.POLLIN)
+            self._poller.poll(timeout)
+        ZOCP.run_once(self, 0)
+        local_bus.dispatch(self, inbox.drain())
+
+    def stop(self):
+        if self._local_inbox is not None:
+            local_bus.unregister(self)
+            self._local_inbox.close()
+        ZOCP.stop(self)
+
+    def _teardown(self):
+        """
+        Called by the loop when it exits, releases what the loop used
+        """
+        if self._poller is not None:
+            self._poller.unregister(self._local_inbox)
+            self._poller = None
+        if self._local_inbox is not None:
+            self._local_inbox.close_sockets()
+
+    def report_metrics(self):
+        """
+        Print the metrics of this actor. If metrics_file is set the metrics
+        are appended to the file. If metrics_capability is set they are
+        emitted as a JSON string in the 'metrics' capability.
+
+        Called every metrics_interval seconds by the loop.
+        """
+        _report_metrics(self)
+        if self.metrics_capability:
+            if self._metrics_registered:
+                self.emit_signal("metrics", self.metrics.to_json())
+            else:
+                self.register_string("metrics", self.metrics.to_json(), "re")
+                self._metrics_registered = True
+
     def _dummy(self, *args, **kwargs):
         pass
 
 
+class ReactiveActor(Actor):
+    """
+    A ReactiveActor class is an :py:class:`Actor<sphof.Actor>` which only
+    runs when something happens. It does not call its update and draw
+    methods every frame but blocks until a signal arrives or a timer is
+    due.
+
+    :param str name: Name of the node, if not given a random name will be created
+
+    Signals are handled by on_peer_signaled as soon as they arrive. Use
+    :py:meth:`.add_timer` to run something periodically and
+    :py:meth:`.request_frame` to have update and draw called once:
+
+    .. code-block:: python
+
+       class BlurActor(ReactiveActor):
+
+           def setup(self):
+               self.register_int("img_in", 0, "rs")
+               self.add_timer(1.0, self.report)
+
+           def on_peer_signaled(self, peer, name, data):
+               self.request_frame()     # run update and draw
+
+    An idle ReactiveActor uses almost no CPU. The loop wakes up at least
+    every max_block seconds to check if the actor was stopped.
+    """
+    max_block = 0.05
+
+    def __init__(self, *args, **kwargs):
+        self._timers = []                       # heap of [deadline, id, interval, callback]
+        self._timer_ids = itertools.count()
+        self._cancelled = set()
+        self._frame_requested = False
+        super(ReactiveActor, self).__init__(*args, **kwargs)
+
+    def add_timer(self, interval, callback, repeat=True):
+        """
+        Call callback every interval seconds. Returns the id of the timer.
+
+        :param float interval: Seconds between calls
+        :param callback: Callable without arguments
+        :param bool repeat: If False the callback is only called once
+        """
+        timer = next(self._timer_ids)
+        heapq.heappush(self._timers,
+                [time.monotonic() + interval, timer, interval if repeat else 0, callback])
+        return timer
+
+    def cancel_timer(self, timer):
+        """
+        Cancel the timer with the given id
+
+        :param int timer: The id returned by :py:meth:`.add_timer`
+        """
+        self._cancelled.add(timer)
+
+    def request_frame(self):
+        """
+        Run the update and draw methods once, after the signals which
+        are currently received are handled
+        """
+        self._frame_requested = True
+
+    def _run_timers(self):
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            deadline, timer, interval, callback = self._timers[0]
+            if timer in self._cancelled:
+                heapq.heappop(self._timers)
+                self._cancelled.discard(timer)
+                continue
+            if interval:
+                # stay on the grid but skip missed calls
+                self._timers[0][0] = deadline + interval * (int((now - deadline) // interval) + 1)
+                heapq.heapreplace(self._timers, self._timers[0])
+            else:
+                heapq.heappop(self._timers)
+            t = time.perf_counter()
+            callback()
+            self.metrics.record("timer", time.perf_counter() - t)
+
+    def _timeout(self):
+        if self._frame_requested:
+            return 0
+        timeout = self.max_block
+        if self._timers:
+            timeout = min(max(self._timers[0][0] - time.monotonic(), 0), timeout)
+        return timeout
+
+    def run(self):
+        """
+        Run the actor's event loop
+        """
+        self._running = True
+        report_at = time.monotonic() + self.metrics_interval
+        try:
+            while self._running:
+                t = time.perf_counter()
+                self.run_once(math.ceil(self._timeout() * 1000))   # wait for signals
+                self.metrics.record("run_once", time.perf_counter() - t)
+                self._run_timers()
+                if self._frame_requested:
+                    self._frame_requested = False
+                    _run_frame(self, 1)
+
+                # stats
+                if report_at < time.monotonic():
+                    self.report_metrics()
+                    report_at = time.monotonic() + self.metrics_interval
+
+        except (KeyboardInterrupt, SystemExit) as e:
+            logger.warning("Actor {0} finished. Exception:{1}".format(self.name(), e))
+        finally:
+            self._running = False
+            self.stop()
+            self._teardown()
+        logger.warning("Actor {0} finished.".format(self.name()))
+
+
 class LeadActor(Actor):
     """
     A LeadActor class runs in the main thread. It inherits all methods 
@@ -257,10 +539,15 @@ class LeadActor(Actor):
     * Use :py:meth:`.Actor.update` method to update anything you\
     have setup
     * Use :py:meth:`.Actor.draw` method to visualise
+
+    :py:class:`sphof.pool.PooledActor` instances added to the LeadActor
+    run on a pool of pool_workers threads instead of their own thread.
     """
-    
+    pool_workers = 4
+
     def __init__(self, *args, **kwargs):
         self.actors = set()
+        self.pool = None
         super(LeadActor, self).__init__(*args, **kwargs)
     
     def start(self):
@@ -271,6 +558,10 @@ class LeadActor(Actor):
         Stop this LeadActor. Before stopping all Actors started
         from this LeadActor are stopped first
         """
+        # stop the workers first, removing thousands of pooled actors
+        # from a busy pool is slow
+        if self.pool:
+            self.pool.stop()
         for act in self.actors:
             act.stop()
         # call our original stop method
@@ -281,22 +572,57 @@ class LeadActor(Actor):
         Add an Actor and run its threaded loop
         
         :param Actor actor: An Actor to start in its own thread
+
+        The on_peer_enter method of this LeadActor is called for the
+        Actor (and the Actor's for this LeadActor) when they handle
+        their next signals, without waiting for the network discovery to
+        find it. Discovery may report the Actor again later, so make the
+        wiring in on_peer_enter safe to repeat. Subscribing to an Actor
+        in this process twice is harmless, its signals are delivered
+        once but its on_peer_subscribed method is called again.
+
+        An :py:class:`sphof.aio.AsyncActor` gets a thread running its own
+        event loop, add it to an :py:class:`sphof.aio.AsyncLeadActor` to
+        share the loop with other AsyncActors.
         
         .. warning:
             You cannot add a LeadActor as only one LeadActor can run
             in the main thread!
         """
+        from .pool import ActorPool, PooledActor
+        from .aio import AsyncActor, AsyncLeadActor
         self.actors.add(actor)
+        if isinstance(actor, PooledActor):
+            if self.pool is None:
+                self.pool = ActorPool(self.pool_workers)
+            self.pool.add(actor)
+        elif isinstance(actor, AsyncActor) and not isinstance(self, AsyncLeadActor):
+            # we have no event loop to run it on
+            actor.start_thread()
+        if self._local_inbox is not None and actor._local_inbox is not None:
+            # a local actor, don't wait for discovery to find it. The
+            # enter is queued like a signal so on_peer_enter runs in the
+            # loop, after setup registered the capabilities
+            peer, name = actor._local_peer
+            self._local_inbox.put((ENTER, peer, name, {}, None))
+            peer, name = self._local_peer
+            actor._local_inbox.put((ENTER, peer, name, {}, None))
         
     def remove_actor(self, actor):
         """
         Remove and stop an Actor
         
         :param Actor actor: An Actor to remove and stop
+
+        The on_peer_exit method of this LeadActor is called for a local
+        Actor like on_peer_enter was.
         """
         try:
             self.actors.remove(actor)
         except KeyError:
-            log.warning("Actor unknown: ".format(actor))
+            logger.warning("Actor unknown: {0}".format(actor))
         else:
             actor.stop()
+            if self._local_inbox is not None and actor._local_inbox is not None:
+                peer, name = actor._local_peer
+                self._local_inbox.put((EXIT, peer, name, None, None))
@@ -0,0 +1,295 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import asyncio
+import threading
+import inspect
+import logging
+import zmq
+from zocp import ZOCP
+from .actors import Actor, LeadActor
+from .local_bus import local_bus
+
+logger = logging.getLogger(__name__)
+
+"""
+Asyncio Actors (:mod:`aio`)
+===========================
+
+.. currentmodule:: aio
+.. autosummary::
+   :toctree:
+
+   AsyncActor
+   AsyncLeadActor
+"""
+
+
+async def _call(method):
+    result = method()
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _run_frame_async(actor, updates):
+    """
+    Like :py:func:`sphof.actors._run_frame` but awaits the methods which
+    are coroutines
+    """
+    clock = time.perf_counter
+    record = actor.metrics.record
+    start = clock()
+    for i in range(updates):
+        t0 = clock()
+        await _call(actor.pre_update)
+        t1 = clock()
+        await _call(actor.update)
+        t2 = clock()
+        await _call(actor.post_update)
+        t3 = clock()
+        record("pre_update", t1 - t0)
+        record("update", t2 - t1)
+        record("post_update", t3 - t2)
+    t0 = clock()
+    await _call(actor.pre_draw)
+    t1 = clock()
+    await _call(actor.draw)
+    t2 = clock()
+    await _call(actor.post_draw)
+    t3 = clock()
+    record("pre_draw", t1 - t0)
+    record("draw", t2 - t1)
+    record("post_draw", t3 - t2)
+    record("frame", t3 - start)
+
+
+class AsyncActor(Actor):
+    """
+    An AsyncActor class runs as an asyncio task instead of in its own
+    thread. Many AsyncActors share the thread of the event loop, usually
+    the loop of an :py:class:`AsyncLeadActor`.
+
+    :param str name: Name of the node, if not given a random name will be created
+
+    The update, draw and on_peer_signaled methods may be coroutines:
+
+    .. code-block:: python
+
+       class Fetcher(AsyncActor):
+
+           async def update(self):
+               peer, name, data = await self.wait_signal("url")
+               self.emit_signal("page", await fetch(data[1]))
+
+    The ZOCP socket is watched by the event loop so signals are handled
+    as soon as they arrive without blocking other tasks.
+
+    .. warning::
+        Methods which are not coroutines block the event loop and all
+        other actors running on it while they run.
+    """
+    max_events = 100        # ZOCP messages handled per wake up
+
+    def __init__(self, *args, **kwargs):
+        self._task = None
+        self._wakeup = None
+        self._waiters = []
+        self._tasks = set()
+        self._signal_callback = self.on_peer_signaled
+        self.on_peer_signaled = self._signaled
+        super(AsyncActor, self).__init__(*args, **kwargs)
+
+    def start(self):
+        ZOCP.start(self)
+
+    def start_thread(self):
+        """
+        Run the actor in its own thread with its own event loop, like an
+        Actor. A :py:class:`sphof.LeadActor` which is not an
+        :py:class:`AsyncLeadActor` starts the AsyncActors it adds this
+        way.
+        """
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def wait_signal(self, emitter=None, peer_name=None):
+        """
+        Returns a future which is done when a signal is received. Its
+        result is the (peer, name, data) of the signal.
+
+        :param str emitter: Only wait for signals of this emitter
+        :param str peer_name: Only wait for signals of the peer with this name
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((emitter, peer_name, future))
+        return future
+
+    def _signaled(self, peer, name, data, *args, **kwargs):
+        result = self._signal_callback(peer, name, data, *args, **kwargs)
+        if inspect.isawaitable(result):
+            self._spawn(result)
+        if self._waiters:
+            waiters, self._waiters = self._waiters, []
+            for waiter in waiters:
+                emitter, peer_name, future = waiter
+                if future.done():
+                    continue
+                if (emitter is None or emitter == data[0]) and \
+                        (peer_name is None or peer_name == name):
+                    future.set_result((peer, name, data))
+                else:
+                    self._waiters.append(waiter)
+
+    def _spawn(self, coro):
+        # keep a reference, the loop only keeps weak references to tasks
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _handle_events(self):
+        sock = self.socket()
+        for i in range(self.max_events):
+            if not sock.getsockopt(zmq.EVENTS) & zmq.POLLIN:
+                break
+            ZOCP.run_once(self, 0)
+        if self._local_inbox is not None:
+            local_bus.dispatch(self, self._local_inbox.drain())
+
+    def _readable(self):
+        # the zmq FD is edge triggered, _handle_events reads until the
+        # socket has no more messages
+        self._handle_events()
+        self._wakeup.set()
+
+    def _pending(self):
+        if self._local_inbox is not None and len(self._local_inbox):
+            return True
+        return bool(self.socket().getsockopt(zmq.EVENTS) & zmq.POLLIN)
+
+    def run(self):
+        """
+        Run the actor in a new event loop until it is stopped
+        """
+        asyncio.run(self.run_async())
+
+    async def run_async(self):
+        """
+        Run the actor's application loop as a coroutine
+        """
+        loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._wakeup = asyncio.Event()
+        # signals are handled as soon as they arrive, also while the
+        # update or draw coroutine is waiting for one
+        fds = [self.socket().getsockopt(zmq.FD)]
+        if self._local_inbox is not None:
+            fds.append(self._local_inbox.fileno())
+        for fd in fds:
+            loop.add_reader(fd, self._readable)
+        self._running = True
+        report_at = time.monotonic() + self.metrics_interval
+        try:
+            self.scheduler.start()
+            while self._running:
+                self._handle_events()
+                if self.scheduler.due():
+                    await _run_frame_async(self, self.scheduler.advance())
+
+                # wait for the next frame or a signal
+                timeout = self.scheduler.timeout()
+                if timeout > 0 and not self._pending():
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(0)              # let other tasks run
+
+                # stats
+                if report_at < time.monotonic():
+                    self.report_metrics()
+                    report_at = time.monotonic() + self.metrics_interval
+        except asyncio.CancelledError:
+            logger.warning("Actor {0} cancelled.".format(self.name()))
+        finally:
+            for fd in fds:
+                loop.remove_reader(fd)
+            self._task = None
+            self._running = False
+            self.stop()
+            self._teardown()
+        logger.warning("Actor {0} finished.".format(self.name()))
+
+    def stop(self):
+        """
+        Stop the actor. When its task is running the task stops the actor
+        when it finishes.
+        """
+        self._running = False
+        task = self._task
+        if task is not None:
+            if self._wakeup:
+                # the loop might run in another thread
+                try:
+                    task.get_loop().call_soon_threadsafe(self._wakeup.set)
+                except RuntimeError:
+                    pass        # the loop is closed
+            return
+        Actor.stop(self)
+
+
+class AsyncLeadActor(AsyncActor, LeadActor):
+    """
+    An AsyncLeadActor class is a :py:class:`sphof.LeadActor` running an
+    asyncio event loop. The :py:class:`AsyncActor` instances it adds run
+    as tasks on its loop, other Actors run in their own thread.
+
+    :param str name: Name of the node, if not given a random name will be created
+
+    Use :py:meth:`.run` like any LeadActor or await :py:meth:`.run_async`
+    from your own event loop, together with your other coroutines:
+
+    .. code-block:: python
+
+       async def main():
+           lead = MyLeadActor("lead")
+           await asyncio.gather(lead.run_async(), serve_http())
+    """
+    stop_timeout = 1.0
+
+    def add_actor(self, actor):
+        """
+        Add an Actor. An AsyncActor is run as a task on the event loop of
+        this LeadActor.
+
+        :param Actor actor: An Actor to start
+        """
+        super(AsyncLeadActor, self).add_actor(actor)
+        if isinstance(actor, AsyncActor) and self._task is not None:
+            actor._task = self._spawn(actor.run_async())
+
+    async def run_async(self):
+        for actor in self.actors:
+            if isinstance(actor, AsyncActor) and actor._task is None:
+                actor._task = self._spawn(actor.run_async())
+        await super(AsyncLeadActor, self).run_async()
+        # give the actors the chance to finish
+        tasks = [actor._task for actor in self.actors
+                    if isinstance(actor, AsyncActor) and actor._task is not None]
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.stop_timeout)
+
+    def stop(self):
+        """
+        Stop this LeadActor. Before stopping all Actors started
+        from this LeadActor are stopped first
+        """
+        self._running = False
+        if self._task is not None:
+            if self._wakeup:
+                self._wakeup.set()
+            return
+        LeadActor.stop(self)
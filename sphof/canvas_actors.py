@@ -2,19 +2,124 @@
 # -*- coding: utf-8 -*-
 import time
 import logging
+import threading
 from random import randint
 import sphof
 from .actors import Actor, LeadActor, LoneActor
+from .shared_frames import is_shared_handle, read_frame
+from .frames import FrameLink, FrameMeta
+from .metrics import LatencyTracker
+from .displays import make_display
 
 logger = logging.getLogger(__name__)
 
 try:
-    import tkinter
-    from PIL import Image, ImageDraw, ImageTk, ImageFont
+    from PIL import Image, ImageDraw, ImageFont
 except:
-    logger.warn("No Tkinter installed")
+    logger.warn("No PIL installed")
     pass
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _xy_arg(args, kwargs):
+    return args[0] if args else kwargs.get("xy")
+
+
+def _width_arg(args, kwargs, index):
+    # the width is a keyword or the positional argument at index of
+    # the ImageDraw method
+    return kwargs.get("width", args[index] if len(args) > index else 1)
+
+
+_drawing_shares_buffer = None
+
+
+def _array_image(array):
+    """
+    Returns an RGBX image drawing directly into the array.
+
+    Images made by Image.frombuffer are readonly and ImageDraw copies a
+    readonly image before drawing on it. Clearing the readonly flag makes
+    PIL draw into the array instead, which PIL does up to at least
+    Pillow 12. It isn't a documented API so it is checked once.
+    """
+    global _drawing_shares_buffer
+    height, width = array.shape[:2]
+    img = Image.frombuffer("RGBX", (width, height), array, "raw", "RGBX", 0, 1)
+    img.readonly = 0
+    if _drawing_shares_buffer is None:
+        test = np.zeros((1, 1, 4), np.uint8)
+        test_img = Image.frombuffer("RGBX", (1, 1), test, "raw", "RGBX", 0, 1)
+        test_img.readonly = 0
+        ImageDraw.Draw(test_img).point((0, 0), fill=(1, 2, 3))
+        _drawing_shares_buffer = tuple(test[0, 0, :3]) == (1, 2, 3)
+    if not _drawing_shares_buffer:
+        raise RuntimeError("PIL {0} can't draw into a numpy array, use a Painter".format(
+                            getattr(Image, "__version__", "")))
+    return img
+
+
+def _bbox(xy):
+    """
+    Returns the bounding box (x0, y0, x1, y1) of a sequence of either
+    2-tuples like ``[(x, y), (x, y), ...]`` or numeric values like
+    ``[x, y, x, y, ...]``
+    """
+    if xy is None or not len(xy):
+        return None
+    if isinstance(xy[0], (tuple, list)):
+        xs = [p[0] for p in xy]
+        ys = [p[1] for p in xy]
+    else:
+        xs = xy[0::2]
+        ys = xy[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _array_bbox(xy):
+    """
+    Returns the bounding box of a numpy array of points, shape (N, 2)
+    """
+    lo = xy.min(axis=0)
+    hi = xy.max(axis=0)
+    return float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1])
+
+
+def _color(fill):
+    """
+    Returns a color usable by ImageDraw
+    """
+    if fill is None or isinstance(fill, (int, str, tuple)):
+        return fill
+    return tuple(int(c) for c in fill)
+
+
+def _batch_colors(fill, n):
+    """
+    Returns fill as an array of n colors or None if fill is one color
+    """
+    if fill is None or isinstance(fill, (int, str, tuple)):
+        return None
+    colors = np.asarray(fill)
+    if colors.ndim < 2:
+        return None
+    return colors.astype(np.uint8).reshape(n, -1)
+
+
+def _union(a, b):
+    """
+    Returns the union of two bounding boxes, either can be None
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
 
 class Painter(object):
     """
@@ -26,12 +131,17 @@ class Painter(object):
     * :py:meth:`.arc`
 
     The default width and height are 200 by 600 pixels.
+
+    The Painter keeps track of the region of the image which changed
+    since it was last handed over, see :py:meth:`.get_damage`.
     
     Each class's method is documented below
     """
     def __init__(self, *args, **kwargs):
         self._img = None
         self._d = None
+        self._damage = None             # region changed since the image was last handed over
+        self._drawn = None              # region drawn since the last reset
         self.background_color = (15,15,15)
         self.width = 200
         self.height = 600
@@ -42,10 +152,69 @@ class Painter(object):
     def reset(self):
         """
         Clears the image to the background color
-        """
-        self._img = Image.new("RGB", (self.width,self.height), self.background_color)
+
+        Only the region changed by the drawing methods is cleared. Use
+        :py:meth:`.invalidate` after changing the pixels of the image
+        another way.
+        """
+        img = getattr(self, "_img", None)       # not there yet after unpickling
+        if img is None or img.size != (self.width, self.height):
+            self._img = None
+            self._damage = (0, 0, self.width, self.height)
+        else:
+            self._damage = _union(self._damage, self._drawn)
+        drawn, self._drawn = self._drawn, None
+        self._clear_canvas(drawn)
+
+    def _clear_canvas(self, drawn):
+        self._img = self._new_canvas()
         self._d = ImageDraw.Draw(self._img)
 
+    def _new_canvas(self):
+        return Image.new("RGB", (self.width,self.height), self.background_color)
+
+    def get_damage(self):
+        """
+        Returns the bounding box (x0, y0, x1, y1) of the region changed
+        since the image was last handed over, None if nothing changed
+        """
+        return self._damage
+
+    def take_damage(self):
+        """
+        Returns the bounding box of the changed region like
+        :py:meth:`.get_damage` and marks the image as handed over
+        """
+        damage = self._damage
+        self._damage = None
+        return damage
+
+    def invalidate(self, box=None):
+        """
+        Mark a region of the image as changed, i.e. after writing its
+        pixels directly. The region is sent to the display and cleared by
+        the next :py:meth:`.reset`.
+
+        :param box: The bounding box (x0, y0, x1, y1), the whole image if not given
+        """
+        if box is None:
+            box = (0, 0, self.width, self.height)
+        self._damage = _union(self._damage, box)
+        self._drawn = _union(self._drawn, box)
+
+    def _add_damage(self, xy, width=1):
+        bbox = _bbox(xy)
+        if bbox is None:
+            return
+        pad = (width or 1) // 2 + 1
+        bbox = (max(int(bbox[0]) - pad, 0), max(int(bbox[1]) - pad, 0),
+                min(int(bbox[2]) + pad + 1, self.width),
+                min(int(bbox[3]) + pad + 1, self.height))
+        if bbox[0] >= bbox[2] or bbox[1] >= bbox[3]:
+            return
+        self._damage = _union(self._damage, bbox)
+        self._drawn = _union(self._drawn, bbox)
+
     def get_width(self):
         """
         Returns the width of the canvas
@@ -86,6 +255,7 @@ class Painter(object):
         :param end: Ending angle, in degrees.
         :param fill: Color to use for the arc.
         """
+        self._add_damage(_xy_arg(args, kwargs), _width_arg(args, kwargs, 4))
         self._d.arc(*args, **kwargs)
 
     def bitmap(self, *args, **kwargs):
@@ -99,6 +269,9 @@ class Painter(object):
         To paste pixel data into an image, use the
         :py:meth:`~PIL.Image.Image.paste` method on the image itself.
         """
+        xy, bitmap = _xy_arg(args, kwargs), kwargs.get("bitmap", args[1] if len(args) > 1 else None)
+        if bitmap is not None:
+            self._add_damage([xy[0], xy[1], xy[0] + bitmap.width, xy[1] + bitmap.height])
         self._d.bitmap(*args, **kwargs)
 
     def chord(self, *args, **kwargs):
@@ -111,6 +284,7 @@ class Painter(object):
         :param outline: Color to use for the outline.
         :param fill: Color to use for the fill.
         """
+        self._add_damage(_xy_arg(args, kwargs), _width_arg(args, kwargs, 5))
         self._d.chord(*args, **kwargs)
 
     def ellipse(self, *args, **kwargs):
@@ -122,6 +296,7 @@ class Painter(object):
         :param outline: Color to use for the outline.
         :param fill: Color to use for the fill.
         """
+        self._add_damage(_xy_arg(args, kwargs), _width_arg(args, kwargs, 3))
         self._d.ellipse(*args, **kwargs)
 
     def line(self, *args, **kwargs):
@@ -134,6 +309,7 @@ class Painter(object):
         :param width: The line width, in pixels. Note that line
             joins are not handled well, so wide polylines will not look good.        
         """
+        self._add_damage(_xy_arg(args, kwargs), _width_arg(args, kwargs, 2))
         self._d.line(*args, **kwargs)
 
     def pieslice(self, *args, **kwargs):
@@ -149,6 +325,7 @@ class Painter(object):
         :param fill: Color to use for the fill.
         :param outline: Color to use for the outline.        
         """
+        self._add_damage(_xy_arg(args, kwargs), _width_arg(args, kwargs, 5))
         self._d.pieslice(*args, **kwargs)
 
     def point(self, *args, **kwargs):
@@ -159,6 +336,7 @@ class Painter(object):
                    numeric values like ``[x, y, x, y, ...]``.
         :param fill: Color to use for the point.        
         """
+        self._add_damage(_xy_arg(args, kwargs))
         self._d.point(*args, **kwargs)
 
     def polygon(self, *args, **kwargs):
@@ -174,6 +352,7 @@ class Painter(object):
         :param outline: Color to use for the outline.
         :param fill: Color to use for the fill.       
         """
+        self._add_damage(_xy_arg(args, kwargs), _width_arg(args, kwargs, 3))
         self._d.polygon(*args, **kwargs)
 
     def rectangle(self, *args, **kwargs):
@@ -186,7 +365,8 @@ class Painter(object):
         :param outline: Color to use for the outline.
         :param fill: Color to use for the fill.       
         """
-        self._d.rectangle(self, *args, **kwargs)
+        self._add_damage(_xy_arg(args, kwargs), _width_arg(args, kwargs, 3))
+        self._d.rectangle(*args, **kwargs)
 
     def text(self, xy, text, fill):
         """
@@ -196,6 +376,11 @@ class Painter(object):
         :param text: Text to be drawn.
         :param fill: Color to use for the text.        
         """
+        if hasattr(self._d, "textbbox"):
+            self._add_damage(self._d.textbbox(xy, text, font=self._font))
+        else:
+            w, h = self._d.textsize(text, self._font)
+            self._add_damage([xy[0], xy[1], xy[0] + w, xy[1] + h])
         self._d.text(xy, text, font=self._font, fill=fill)
     
     def textsize(self, text):
@@ -206,6 +391,169 @@ class Painter(object):
         """
         self._d.textsize(text, self._font)
 
+    def points(self, xy, fill):
+        """
+        Draws many points (individual pixels) in one call. Requires numpy.
+
+        :param xy: Array of N points, shape (N, 2)
+        :param fill: Color to use for all points or an array of N colors, shape (N, 3)
+        """
+        xy = np.asarray(xy).reshape(-1, 2)
+        if not len(xy):
+            return
+        xs = np.rint(xy[:, 0]).astype(np.intp)
+        ys = np.rint(xy[:, 1]).astype(np.intp)
+        self._write_pixels(xs, ys, fill)
+
+    def lines(self, segments, fill, width=1):
+        """
+        Draws many line segments in one call. Requires numpy.
+
+        :param segments: Array of N segments, shape (N, 4), each row x0, y0, x1, y1
+        :param fill: Color to use for all segments or an array of N colors, shape (N, 3)
+        :param width: The line width in pixels, for all segments or an array of N widths
+
+        Segments with a width of 1 are rasterized together using numpy,
+        wider segments are drawn one by one.
+        """
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        if not len(segments):
+            return
+        widths = np.broadcast_to(np.asarray(width), (len(segments),))
+        colors = _batch_colors(fill, len(segments))
+        thin = widths <= 1
+        if thin.all():
+            self._rasterize_lines(segments, fill)
+            return
+        if thin.any():
+            self._rasterize_lines(segments[thin], fill if colors is None else colors[thin])
+        wide = ~thin
+        line = self._d.line
+        color = _color(fill) if colors is None else None
+        for seg, w, c in zip(segments[wide].tolist(), widths[wide].tolist(),
+                             colors[wide].tolist() if colors is not None else [color] * int(wide.sum())):
+            line(seg, tuple(c) if isinstance(c, list) else c, int(w))
+        self._add_damage(_array_bbox(segments[wide].reshape(-1, 2)), int(widths[wide].max()))
+
+    def ellipses(self, boxes, fill=None, outline=None):
+        """
+        Draws many ellipses in one call. Requires numpy.
+
+        The ellipses are still drawn one by one, only the colors and the
+        damage are handled for all ellipses at once.
+
+        :param boxes: Array of N bounding boxes, shape (N, 4), each row x0, y0, x1, y1
+        :param fill: Color to use for all ellipses or an array of N colors, shape (N, 3)
+        :param outline: Color to use for all outlines or an array of N colors, shape (N, 3)
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        if not len(boxes):
+            return
+        n = len(boxes)
+        fills = _batch_colors(fill, n)
+        fills = fills.tolist() if fills is not None else [_color(fill)] * n
+        outlines = _batch_colors(outline, n)
+        outlines = outlines.tolist() if outlines is not None else [_color(outline)] * n
+        ellipse = self._d.ellipse
+        for box, f, o in zip(boxes.tolist(), fills, outlines):
+            ellipse(box, tuple(f) if isinstance(f, list) else f,
+                         tuple(o) if isinstance(o, list) else o)
+        self._add_damage(_array_bbox(boxes.reshape(-1, 2)))
+
+    def _rasterize_lines(self, segments, fill):
+        # sample every segment at one pixel steps along its longest axis
+        lengths = np.abs(segments[:, 2:] - segments[:, :2]).max(axis=1)
+        steps = np.ceil(lengths).astype(np.intp) + 1
+        idx = np.repeat(np.arange(len(segments)), steps)
+        starts = np.repeat(np.cumsum(steps) - steps, steps)
+        t = (np.arange(len(idx)) - starts) / np.maximum(steps - 1, 1)[idx]
+        seg = segments[idx]
+        xs = np.rint(seg[:, 0] + t * (seg[:, 2] - seg[:, 0])).astype(np.intp)
+        ys = np.rint(seg[:, 1] + t * (seg[:, 3] - seg[:, 1])).astype(np.intp)
+        colors = _batch_colors(fill, len(segments))
+        self._write_pixels(xs, ys, fill if colors is None else colors[idx])
+
+    def _write_pixels(self, xs, ys, fill):
+        """
+        Set the pixels at xs, ys to the color or the array of colors
+        """
+        colors = _batch_colors(fill, len(xs))
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        if not inside.all():
+            xs, ys = xs[inside], ys[inside]
+            if colors is not None:
+                colors = colors[inside]
+        if not len(xs):
+            return
+        x0, y0 = int(xs.min()), int(ys.min())
+        box = (x0, y0, int(xs.max()) + 1, int(ys.max()) + 1)
+        self._damage = _union(self._damage, box)
+        self._drawn = _union(self._drawn, box)
+        if colors is None:
+            self._d.point(np.column_stack((xs, ys)).ravel().tolist(), fill=_color(fill))
+            return
+        # write all pixels of the affected region at once
+        region = np.array(self._img.crop(box))
+        region[ys - y0, xs - x0] = colors
+        self._img.paste(Image.fromarray(region, self._img.mode), box[:2])
+
+
+class NumpyPainter(Painter):
+    """
+    The NumpyPainter class is a :py:class:`Painter<sphof.Painter>` which
+    paints on a numpy array. Requires numpy.
+
+    The array has a shape of (height, width, 4) and holds RGBX pixels
+    (the fourth byte is unused). The PIL image is a view on the array so
+    all drawing methods paint directly into the array and the array can
+    be handed to numpy or OpenCV functions without conversion:
+
+    .. code-block:: python
+
+       arr = self.get_array()           # the RGBX pixels
+       rgb = self.get_rgb()             # a view on the RGB channels
+       rgb[:] = cv2.GaussianBlur(rgb, (5, 5), 0)
+
+    The array of an image sent by a :py:class:`NumpyPainterActor` is
+    available in the image's info as 'array'.
+    """
+    def _new_canvas(self):
+        array = np.empty((self.height, self.width, 4), np.uint8)
+        array[...] = tuple(self.background_color) + (255,)
+        img = _array_image(array)
+        img.info["array"] = array
+        return img
+
+    def get_array(self):
+        """
+        Returns the numpy array of the canvas, shape (height, width, 4).
+        The whole canvas is marked as changed, see :py:meth:`.invalidate`.
+        """
+        self.invalidate()
+        return self._img.info["array"]
+
+    def get_rgb(self):
+        """
+        Returns a view on the RGB channels of the canvas, shape (height, width, 3).
+        The whole canvas is marked as changed, see :py:meth:`.invalidate`.
+        """
+        self.invalidate()
+        return self._img.info["array"][..., :3]
+
+    def _write_pixels(self, xs, ys, fill):
+        colors = _batch_colors(fill, len(xs))
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        if not inside.all():
+            xs, ys = xs[inside], ys[inside]
+            if colors is not None:
+                colors = colors[inside]
+        if not len(xs):
+            return
+        box = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+        self._damage = _union(self._damage, box)
+        self._drawn = _union(self._drawn, box)
+        self._img.info["array"][ys, xs, :3] = _color(fill) if colors is None else colors[:, :3]
+
 
 class PainterActor(Painter, Actor):
     """
@@ -252,6 +600,20 @@ class PainterActor(Painter, Actor):
     pointer to the image of this Actor. It calls reset() so the actor
     can paint on a new canvas. 
 
+    The PainterActor paints on a fixed number of canvases (buffer_count)
+    which are reused once the receivers have released them. If all
+    canvases are still in use by receivers the buffer_policy determines
+    what :py:meth:`.send_img` does:
+
+    * "block": wait until a canvas is released (at most buffer_timeout seconds)
+    * "drop": drop the frame, the canvas is cleared and not sent
+
+    At most max_in_flight images are sent but not yet released by the
+    receivers. Use :py:meth:`.credits` to check whether an image can be
+    sent, if not :py:meth:`.send_img` drops the frame. If latest_only is
+    set sending an image drops the images no receiver fetched yet, so
+    receivers always get the newest image.
+
     This class has many methods inherited from the 
     :py:class:`sphof.Painter` class, ie:
 
@@ -263,19 +625,142 @@ class PainterActor(Painter, Actor):
     Each class's extra methods are documented below.
     """
 
+    buffer_count = 3
+    buffer_policy = "block"
+    buffer_timeout = 1.0
+    max_in_flight = 2
+    latest_only = False
+
     def __init__(self, *args, **kwargs):
+        self._frame_seq = 0
+        self._link = FrameLink(sphof.shared_ns, self.max_in_flight, self.latest_only)
+        self._free = []                 # canvases ready for reuse
+        self._buffers = threading.Condition(threading.RLock())
+        self._img_sent = False
+        self.dropped_frames = 0
         super(PainterActor, self).__init__(*args, **kwargs)
-        self.register_int("imgID", id(self._img), 're')
 
-    def send_img(self):
+    def start(self):
+        # register the emitter before the loop can call send_img
+        self.register_int("imgID", 0, 're')
+        super(PainterActor, self).start()
+
+    def send_img(self, refs=1):
         """
         Sends the image as a signal to any subscribers using the 'imgID'
         emitter. The canvas is reset after the image is sent!
-        """
-        imgID = id(self._img)
-        sphof.shared_ns[imgID] = self._img
+
+        :param int refs: The number of receivers of the image
+
+        The image is stored in the :py:class:`sphof.FrameRegistry` until
+        all receivers have fetched it. The image's info contains the
+        'damage' region compared to the previous image sent, see
+        :py:meth:`sphof.Painter.get_damage`. Its
+        :py:class:`sphof.frames.FrameMeta` has the time painting the
+        image started as origin.
+
+        Returns False if the frame was dropped.
+        """
+        if not (self.latest_only or self._link.credits()) or not self._acquire_buffer():
+            logger.debug("{0}: dropping frame".format(self.name()))
+            self.dropped_frames += 1
+            self.metrics.count("frames_dropped")
+            self.reset()
+            return False
+        self._frame_seq += 1
+        damage = self._img.info["damage"] = self.take_damage()
+        self._img.info["frame"] = (id(self), self._frame_seq)
+        self._img.info["drawn"] = self._drawn
+        meta = FrameMeta(self.name(), self._frame_seq, self._frame_start).hop(self.name())
+        imgID = self._link.send(self._img, refs, self._release_buffer, meta, self._evict_buffer)
+        if imgID is None:
+            # keep the damage for the next frame
+            self._damage = _union(self._damage, damage)
+            self.dropped_frames += 1
+            self.metrics.count("frames_dropped")
+            self.reset()
+            return False
+        self._img_sent = True
         self.reset()
         self.emit_signal("imgID", imgID)
+        self.metrics.count("frames_sent")
+        self.metrics.gauge("in_flight", self._link.in_flight())
+        return True
+
+    def credits(self):
+        """
+        Returns the number of images which can be sent before
+        :py:meth:`.send_img` drops frames
+        """
+        return self._link.credits()
+
+    def _acquire_buffer(self):
+        """
+        Make sure a canvas is free for the next frame
+        """
+        deadline = time.monotonic() + self.buffer_timeout
+        while True:
+            with self._buffers:
+                if self._free:
+                    return True
+                if self.buffer_policy == "drop" or time.monotonic() > deadline:
+                    return False
+                self._buffers.wait(0.1)
+                if self._free:
+                    return True
+            # receivers which disappeared only release by eviction
+            sphof.shared_ns.evict()
+
+    def _release_buffer(self, handle, img):
+        with self._buffers:
+            if img.size == (self.width, self.height):
+                self._free.append(img)
+                self._buffers.notify()
+
+    def _evict_buffer(self, handle, img):
+        # a receiver may still be showing an evicted canvas, replace it
+        # by a new one instead of drawing on it
+        with self._buffers:
+            if img.size == (self.width, self.height):
+                self._free.append(self._new_canvas())
+                self._buffers.notify()
+
+    def _clear_canvas(self, drawn):
+        self._frame_start = time.monotonic()
+        with self._buffers:
+            if self._img is None or self._img.size != (self.width, self.height):
+                # (re)allocate all canvases
+                self._free = [self._new_canvas() for i in range(self.buffer_count - 1)]
+                self._img_sent = False
+                Painter._clear_canvas(self, drawn)
+                return
+            if self._img_sent:
+                # continue on a free canvas
+                if self._free:
+                    self._img = self._free.pop()
+                else:
+                    self._img = self._new_canvas()
+                drawn = self._img.info.pop("drawn", None)
+                self._img_sent = False
+        # only clear what was drawn on the canvas
+        if drawn:
+            self._img.paste(self.background_color, drawn)
+        self._d = ImageDraw.Draw(self._img)
+
+
+class NumpyPainterActor(NumpyPainter, PainterActor):
+    """
+    The NumpyPainterActor class is a :py:class:`PainterActor<sphof.PainterActor>`
+    painting on numpy arrays, see :py:class:`NumpyPainter<sphof.NumpyPainter>`.
+
+    Receivers can use the array of a received image without copying it:
+
+    .. code-block:: python
+
+       img = self.get_img_from_id(imgID)
+       arr = img.info["array"]
+    """
+    pass
 
 
 class CanvasActor(Painter, LeadActor):
@@ -313,62 +798,175 @@ class CanvasActor(Painter, LeadActor):
                     self.draw_img(self.painter_img)
        la = MyCanvas()
        la.run()
+
+    :param display: Where to show the canvas: "tk" for a window, "offscreen" to \
+    render without a window or a display instance, see :py:mod:`sphof.displays`. \
+    Defaults to the SPHOF_DISPLAY environment variable or "tk".
+
+    To render the frames to a numpy array instead of a window:
+
+    ..  code-block:: python
+
+        from sphof.displays import OffscreenDisplay, ArraySink
+
+        la = MyCanvas("Canvas", display=OffscreenDisplay(sink=ArraySink()))
+
+    The latency of the images drawn, from their origin (i.e. when a
+    PainterActor started painting them) to the display, is recorded per
+    source in the latency attribute, a
+    :py:class:`sphof.metrics.LatencyTracker`. Every hop of the images is
+    measured so a slow actor in a chain stands out:
+
+    ..  code-block:: python
+
+        self.latency.to_dict()["PainterName"]["total"]["p99"]
+        self.latency.slowest("PainterName")
     """
     def __init__(self, *args, **kwargs):
-        self._display = tkinter.Tk()
-        self.canvas = tkinter.Canvas(self._display, width=800, height=600)
-        self.canvas.pack()
-        self._display.bind("<Button>", self._button_click_exit_mainloop)
-
+        self.display = make_display(kwargs.pop("display", None), 800, 600)
+        self.canvas = getattr(self.display, "canvas", None)
+        self._held = []                 # (imgID, img) to release after drawing
+        self._layers = {}               # layer : (imgID, img) shown in the layer
+        self._held_meta = []            # meta of the images drawn
+        self.latency = None
         super(CanvasActor, self).__init__(*args, **kwargs)
-        self._image = ImageTk.PhotoImage(self._img)
-        self.canvas.create_image(0, 0, image=self._image, anchor='nw')
-
-    def _button_click_exit_mainloop(self, event):
-        event.widget.quit() # this will cause mainloop to unblock.
+        self.latency = LatencyTracker(self.metrics)
+        self.pre_draw()
 
     def get_img_from_id(self, imgID):
         """
-        Get the image from the given imgID
-        """
-        img = sphof.shared_ns.pop(imgID)
-        return ImageTk.PhotoImage(img)
-
-    def draw_img(self, img, x=0, y=0):
+        Get the image from the given imgID. Returns None if the image is
+        not available anymore.
+
+        The imgID can also be the handle of an image sent by a
+        :py:class:`sphof.ProcessPainterActor`.
+
+        The image is released to its PainterActor after the next draw
+        unless it is drawn with :py:meth:`.draw_img`. Then it is held
+        until another image is drawn in its layer, so you can keep
+        drawing it every frame. Don't keep an image you didn't draw, its
+        PainterActor will paint on it again.
+        """
+        if is_shared_handle(imgID):
+            img = read_frame(imgID)
+        else:
+            meta = sphof.shared_ns.info(imgID)
+            img = sphof.shared_ns.get(imgID)
+            if img is not None:
+                self._held.append((imgID, img))
+                if meta is not None:
+                    self._held_meta.append(meta)
+        if img is None:
+            logger.debug("Image {0} not available".format(imgID))
+            self.metrics.count("frames_missing")
+        else:
+            self.metrics.count("frames_received")
+            self.metrics.gauge("held", len(self._held))
+        return img
+
+    def draw_img(self, img, x=0, y=0, layer=None):
         """
         Draw the image at position x,y
+
+        :param img: The image to draw, a PIL image or a tkinter PhotoImage
+        :param int x: The x position
+        :param int y: The y position
+        :param layer: The layer to draw the image in, defaults to the position
+
+        Every layer holds one image. Drawing an image in a layer replaces
+        the image drawn in the layer before. Drawing the same PIL image
+        again doesn't upload it again.
         """
-        self.canvas.create_image(x, y, image=img, anchor='nw')
+        if layer is None:
+            layer = (x, y)
+        self._hold(layer, img)
+        if isinstance(img, Image.Image):
+            self.display.blit(layer, img, x, y)
+        else:
+            self.display.show(layer, img, x, y)
 
     def pre_draw(self):
-        self._image = ImageTk.PhotoImage(self._img)
-        self.canvas.create_image(0, 0, image=self._image, anchor='nw')
+        damage = self.take_damage()
+        if damage:
+            self.display.blit("background", self._img, damage=damage)
 
     def post_draw(self):
-        self._display.update()
+        self.display.update()
+        if self._held_meta and self.latency is not None:
+            now = time.monotonic()
+            for meta in self._held_meta:
+                self.latency.record(meta, "display", now)
+        del self._held_meta[:]
+        for imgID, img in self._held:
+            sphof.shared_ns.release(imgID)
+        del self._held[:]
+
+    def _hold(self, layer, img):
+        # keep the image of a layer in the registry while it is shown so
+        # its PainterActor doesn't paint on it
+        shown = self._layers.get(layer)
+        if shown is not None and shown[1] is img:
+            return
+        for i, held in enumerate(self._held):
+            if held[1] is img:
+                self._layers[layer] = self._held.pop(i)
+                break
+        else:
+            self._layers.pop(layer, None)
+        if shown is not None:
+            sphof.shared_ns.release(shown[0])
+
+    def stop(self):
+        # give the images back to their PainterActors
+        for imgID, img in self._held + list(self._layers.values()):
+            sphof.shared_ns.release(imgID)
+        del self._held[:]
+        self._layers.clear()
+        super(CanvasActor, self).stop()
+        _close_display(self)
+
+    def report_metrics(self):
+        super(CanvasActor, self).report_metrics()
+        if self.latency is not None:
+            for source in sorted(self.latency.sources()):
+                print("{0}: {1}".format(self.name(), self.latency.summary(source)))
 
 
 class LonePainterActor(Painter, LoneActor):
+    """
+    The LonePainterActor class is a :py:class:`LoneActor<sphof.LoneActor>`
+    with all the :py:class:`Painter<sphof.Painter>` class's methods. Its
+    drawing is shown on screen.
 
-    def __init__(self, *args, **kwargs):
-        self._display = tkinter.Tk()
-        self.canvas = tkinter.Canvas(self._display, width=800, height=600)
-        self.canvas.pack()
-        self._display.bind("<Button>", self._button_click_exit_mainloop)
+    :param display: Where to show the canvas, see :py:class:`sphof.CanvasActor`
+    """
 
+    def __init__(self, *args, **kwargs):
+        self.display = make_display(kwargs.pop("display", None), 800, 600)
+        self.canvas = getattr(self.display, "canvas", None)
         super(LonePainterActor, self).__init__(*args, **kwargs)
-        self._image = ImageTk.PhotoImage(self._img)
-        self.canvas.create_image(0, 0, image=self._image, anchor='nw')
-
-    def _button_click_exit_mainloop(self, event):
-        event.widget.quit() # this will cause mainloop to unblock.
+        self.pre_draw()
 
     def pre_draw(self):
-        self._image = ImageTk.PhotoImage(self._img)
-        self.canvas.create_image(0, 0, image=self._image, anchor='nw')
+        damage = self.take_damage()
+        if damage:
+            self.display.blit("background", self._img, damage=damage)
 
     def post_draw(self):
-        self._display.update()
+        self.display.update()
+
+    def run(self):
+        try:
+            super(LonePainterActor, self).run()
+        finally:
+            _close_display(self)
+
+
+def _close_display(actor):
+    # stop can be called more than once, close the display only once
+    display, actor.display = actor.display, None
+    if display is not None:
+        display.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,274 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+"""
+Capture sources (:mod:`capture`)
+================================
+
+.. currentmodule:: capture
+.. autosummary::
+   :toctree:
+
+   CaptureSource
+   VideoSource
+   SyntheticSource
+"""
+
+CapturedFrame = namedtuple("CapturedFrame", ("seq", "image", "timestamp"))
+
+
+class SyntheticSource(object):
+    """
+    The SyntheticSource class generates moving test frames so capture
+    can be tested without a camera.
+
+    :param int width: Width of the frames
+    :param int height: Height of the frames
+    :param float fps: Frames per second generated
+    """
+    def __init__(self, width=640, height=480, fps=30.):
+        self.width = width
+        self.height = height
+        self.period = 1. / fps if fps else 0
+        self._next = time.monotonic()
+        self._count = 0
+        self._ramp = np.arange(width, dtype=np.uint16)
+
+    def read(self, out=None):
+        """
+        Returns (True, frame), the frame is written into out if given
+        """
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next + self.period, time.monotonic())
+        if out is None:
+            out = np.empty((self.height, self.width, 3), np.uint8)
+        # a gradient scrolling one pixel per frame
+        row = ((self._ramp + self._count) % 256).astype(np.uint8)
+        out[...] = row[None, :, None]
+        self._count += 1
+        return True, out
+
+    def release(self):
+        return
+
+
+class VideoSource(object):
+    """
+    The VideoSource class reads frames from a camera or a video file
+    using OpenCV.
+
+    :param source: Camera index or path of a video file
+    :param bool loop: Restart a video file when it ends
+    """
+    def __init__(self, source=0, loop=True):
+        if cv2 is None:
+            raise RuntimeError("No OpenCV installed, use a SyntheticSource")
+        self.capture = cv2.VideoCapture(source)
+        self.loop = loop and isinstance(source, str)
+
+    def read(self, out=None):
+        """
+        Returns (success, frame), the frame is read into out if given
+        """
+        ok, frame = self.capture.read(out)
+        if not ok and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read(out)
+        return ok, frame
+
+    def release(self):
+        self.capture.release()
+
+
+def open_source(source):
+    """
+    Returns a source for the given argument: 'synthetic' or
+    'synthetic:WIDTHxHEIGHT' for a :py:class:`SyntheticSource`, a camera
+    index or file name for a :py:class:`VideoSource` and any object with
+    a read(out) method as is.
+    """
+    if hasattr(source, "read"):
+        return source
+    if isinstance(source, str) and source.startswith("synthetic"):
+        if ":" in source:
+            width, height = source.split(":", 1)[1].split("x")
+            return SyntheticSource(int(width), int(height))
+        return SyntheticSource()
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    return VideoSource(source)
+
+
+class CaptureSource(object):
+    """
+    The CaptureSource class reads frames on its own thread into a small
+    ring of preallocated numpy buffers. The newest frame is always
+    available through :py:meth:`.latest` without waiting for the camera.
+
+    :param source: A camera index, video file, 'synthetic' or a source object, see :py:func:`open_source`
+    :param int slots: Number of buffers in the ring
+    :param float fps: Maximum frames per second read, None reads as fast as the source delivers
+
+    Every frame gets a sequence number. Frames which were overwritten
+    before anyone got them are counted as dropped:
+
+    .. code-block:: python
+
+       capture = CaptureSource(0).start()
+       seq = 0
+       ...
+       frame = capture.latest(after=seq)
+       if frame.image is not None:
+           seq = frame.seq
+    """
+    def __init__(self, source=0, slots=3, fps=None):
+        if slots < 2:
+            raise ValueError("A capture ring needs at least 2 slots")
+        self.source = open_source(source)
+        self.slot_count = slots
+        self.period = 1. / fps if fps else 0
+        self._slots = None              # buffers, allocated on the first frame
+        self._seqs = [0] * slots
+        self._stamps = [0.] * slots
+        self._readers = [0] * slots     # readers copying from a slot
+        self._newest = None
+        self._taken = True              # the newest frame was taken
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.seq = 0                    # sequence of the newest frame
+        self.captured = 0               # frames read from the source
+        self.dropped = 0                # frames nobody took
+        self.failed = 0                 # failed reads
+
+    def start(self):
+        """
+        Start the capture thread. Returns the CaptureSource.
+        """
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="CaptureSource")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the capture thread and release the source
+        """
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+        self.source.release()
+
+    def latest(self, out=None, after=0, timeout=0):
+        """
+        Returns the newest frame as a CapturedFrame (seq, image, timestamp).
+        The image is None if there is no frame newer than after.
+
+        :param out: A numpy array to copy the frame into, a new array is returned if not given
+        :param int after: Only return a frame with a higher sequence number
+        :param float timeout: Seconds to wait for a new frame
+        """
+        with self._cond:
+            if self.seq <= after and timeout:
+                self._cond.wait_for(lambda: self.seq > after or not self._running, timeout)
+            if self._newest is None or self.seq <= after:
+                return CapturedFrame(self.seq, None, None)
+            slot = self._newest
+            self._readers[slot] += 1
+            self._taken = True
+            seq, stamp, buf = self._seqs[slot], self._stamps[slot], self._slots[slot]
+        try:
+            # the writer never writes a slot which is being read
+            if out is None:
+                image = buf.copy()
+            else:
+                np.copyto(out, buf)
+                image = out
+        finally:
+            with self._cond:
+                self._readers[slot] -= 1
+                self._cond.notify_all()
+        return CapturedFrame(seq, image, stamp)
+
+    def stats(self):
+        """
+        Returns the capture counters
+        """
+        return {"seq": self.seq, "captured": self.captured,
+                "dropped": self.dropped, "failed": self.failed}
+
+    def _free_slot(self):
+        # called with the lock held, the oldest slot not being read
+        # which isn't the newest frame
+        candidates = [i for i in range(self.slot_count)
+                        if i != self._newest and not self._readers[i]]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda i: self._seqs[i])
+
+    def _run(self):
+        next_read = time.monotonic()
+        while self._running:
+            if self.period:
+                delay = next_read - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_read = max(next_read + self.period, time.monotonic())
+            with self._cond:
+                slot = None
+                if self._slots is not None:
+                    self._cond.wait_for(lambda: self._free_slot() is not None or not self._running)
+                    slot = self._free_slot()
+            if not self._running:
+                break
+            buf = self._slots[slot] if slot is not None else None
+            try:
+                ok, frame = self.source.read(buf)
+            except Exception as e:
+                logger.warning("Capture failed: {0}".format(e))
+                ok, frame = False, None
+            stamp = time.monotonic()
+            if not ok or frame is None:
+                self.failed += 1
+                time.sleep(0.01)
+                continue
+            with self._cond:
+                if self._slots is None:
+                    # allocate the ring now we know the frame size
+                    self._slots = [np.empty_like(frame) for i in range(self.slot_count)]
+                    slot = 0
+                if frame is not self._slots[slot]:
+                    if frame.shape != self._slots[slot].shape:
+                        logger.warning("Frame size changed, reallocating the capture ring")
+                        self._slots = [np.empty_like(frame) for i in range(self.slot_count)]
+                    np.copyto(self._slots[slot], frame)
+                if not self._taken:
+                    self.dropped += 1
+                self.seq += 1
+                self.captured += 1
+                self._seqs[slot] = self.seq
+                self._stamps[slot] = stamp
+                self._newest = slot
+                self._taken = False
+                self._cond.notify_all()
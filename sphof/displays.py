@@ -0,0 +1,341 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+except:
+    logger.warn("No PIL installed")
+    pass
+
+# tkinter is only imported when a tkinter display is used, headless
+# actors don't need it
+tkinter = None
+ImageTk = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+Displays (:mod:`displays`)
+==========================
+
+.. currentmodule:: displays
+.. autosummary::
+   :toctree:
+
+   TkDisplay
+   OffscreenDisplay
+   NullSink
+   ArraySink
+   ImageSequenceSink
+"""
+
+
+def _load_tk():
+    """
+    Import tkinter and PIL's ImageTk. Returns False if they are not
+    installed.
+    """
+    global tkinter, ImageTk
+    if tkinter is None:
+        try:
+            import tkinter as tk
+            from PIL import ImageTk as image_tk
+        except ImportError:
+            return False
+        tkinter, ImageTk = tk, image_tk
+    return True
+
+
+class Compositor(object):
+    """
+    The Compositor class keeps one item on a tkinter canvas per layer.
+    Instead of creating a new canvas item every frame the image of the
+    layer's item is replaced.
+
+    :param canvas: The tkinter canvas to draw on
+
+    Layers are stacked in the order they are created.
+    """
+    def __init__(self, canvas):
+        _load_tk()
+        self.canvas = canvas
+        self._layers = {}               # key : [item, image, (x, y)]
+        self._surfaces = {}             # key : [PhotoImage, source image]
+
+    def show(self, key, image, x=0, y=0):
+        """
+        Show the image in the layer with the given key
+
+        :param key: The key of the layer, i.e. its name or position
+        :param image: A tkinter PhotoImage
+        :param int x: The x position of the layer
+        :param int y: The y position of the layer
+        """
+        layer = self._layers.get(key)
+        if layer is None:
+            item = self.canvas.create_image(x, y, image=image, anchor='nw')
+            self._layers[key] = [item, image, (x, y)]
+            return
+        if layer[1] is not image:
+            self.canvas.itemconfig(layer[0], image=image)
+            layer[1] = image            # keep a reference for tkinter
+        if layer[2] != (x, y):
+            self.canvas.coords(layer[0], x, y)
+            layer[2] = (x, y)
+
+    def blit(self, key, img, x=0, y=0, damage=None):
+        """
+        Upload a PIL image into the layer with the given key. Every layer
+        has its own PhotoImage which is updated in place. The upload is
+        skipped if the image was uploaded before and hasn't changed.
+
+        :param key: The key of the layer, i.e. its name or position
+        :param img: A PIL image
+        :param int x: The x position of the layer
+        :param int y: The y position of the layer
+        :param tuple damage: The bounding box of the region which changed since the last upload
+
+        If no damage is given the damage sent along with the image by a
+        :py:class:`sphof.PainterActor` is used when the image directly follows
+        the previous image of the layer. Only the damaged region is
+        uploaded.
+        """
+        frame = img.info.get("frame")
+        surface = self._surfaces.get(key)
+        if surface is None or surface[0].width() != img.width \
+                or surface[0].height() != img.height:
+            surface = [ImageTk.PhotoImage(img), img, frame]
+            self._surfaces[key] = surface
+            self.show(key, surface[0], x, y)
+            return
+        if damage is None:
+            if surface[1] is img and surface[2] == frame:
+                damage = ()             # nothing changed
+            elif frame and surface[2] and frame[0] == surface[2][0] \
+                    and frame[1] == surface[2][1] + 1:
+                damage = img.info.get("damage") or ()
+        self._paste(surface[0], img, damage)
+        surface[1] = img
+        surface[2] = frame
+        self.show(key, surface[0], x, y)
+
+    def _paste(self, photo, img, box):
+        if box is None or (box[2] - box[0]) * (box[3] - box[1]) * 2 > img.width * img.height:
+            photo.paste(img)
+        elif box:
+            # upload the region into a small image and copy it in place
+            patch = ImageTk.PhotoImage(img.crop(box))
+            self.canvas.tk.call(str(photo), "copy", str(patch), "-to", box[0], box[1])
+
+    def remove(self, key):
+        """
+        Remove the layer with the given key
+        """
+        self._surfaces.pop(key, None)
+        layer = self._layers.pop(key, None)
+        if layer:
+            self.canvas.delete(layer[0])
+
+    def clear(self):
+        """
+        Remove all layers
+        """
+        for key in list(self._layers):
+            self.remove(key)
+
+
+class TkDisplay(object):
+    """
+    The TkDisplay class shows the layers of a canvas actor in a tkinter
+    window.
+
+    :param int width: Width of the window
+    :param int height: Height of the window
+
+    Clicking the window stops the tkinter mainloop.
+    """
+    def __init__(self, width=800, height=600):
+        if not _load_tk():
+            raise RuntimeError("No Tkinter installed, use the offscreen display")
+        self.root = tkinter.Tk()
+        self.canvas = tkinter.Canvas(self.root, width=width, height=height)
+        self.canvas.pack()
+        self.root.bind("<Button>", self._button_click_exit_mainloop)
+        self.compositor = Compositor(self.canvas)
+
+    def _button_click_exit_mainloop(self, event):
+        event.widget.quit() # this will cause mainloop to unblock.
+
+    def blit(self, key, img, x=0, y=0, damage=None):
+        """
+        Show a PIL image in the layer with the given key, see
+        :py:meth:`Compositor.blit`
+        """
+        self.compositor.blit(key, img, x, y, damage)
+
+    def show(self, key, image, x=0, y=0):
+        """
+        Show a tkinter PhotoImage in the layer with the given key
+        """
+        self.compositor.show(key, image, x, y)
+
+    def update(self):
+        """
+        Present the frame
+        """
+        self.root.update()
+
+    def close(self):
+        self.root.destroy()
+
+
+class OffscreenDisplay(object):
+    """
+    The OffscreenDisplay class composes the layers of a canvas actor into
+    an image without showing a window. Every frame is handed to a sink.
+
+    :param int width: Width of the frame
+    :param int height: Height of the frame
+    :param sink: Where the frames go, a :py:class:`NullSink` if not given
+
+    Use it to run canvas actors on machines without a display or to
+    benchmark them without the tkinter overhead.
+    """
+    def __init__(self, width=800, height=600, sink=None):
+        self.frame = Image.new("RGB", (width, height))
+        self.sink = sink or NullSink()
+        self._layers = {}               # key : [surface, source image, (x, y), frame]
+        self._changed = True
+
+    def blit(self, key, img, x=0, y=0, damage=None):
+        """
+        Copy a PIL image into the layer with the given key. Like the
+        :py:class:`Compositor` every layer has its own surface which is
+        updated in place, so the source image may be reused or released
+        once this returns. Only the damaged region is copied, see
+        :py:meth:`Compositor.blit`.
+        """
+        frame = img.info.get("frame")
+        layer = self._layers.get(key)
+        if layer is None or layer[0].size != img.size:
+            self._layers[key] = [img.copy(), img, (x, y), frame]
+            self._changed = True
+            return
+        if damage is None:
+            if layer[1] is img and layer[3] == frame:
+                damage = ()             # nothing changed
+            elif frame and layer[3] and frame[0] == layer[3][0] \
+                    and frame[1] == layer[3][1] + 1:
+                damage = img.info.get("damage") or ()
+        if damage is None:
+            layer[0].paste(img)
+        elif damage:
+            layer[0].paste(img.crop(damage), damage[:2])
+        if damage != () or layer[2] != (x, y):
+            self._changed = True
+        layer[1:] = [img, (x, y), frame]
+
+    def show(self, key, image, x=0, y=0):
+        """
+        Show an image in the layer with the given key. A tkinter
+        PhotoImage is converted to a PIL image.
+        """
+        if not isinstance(image, Image.Image):
+            _load_tk()
+            image = ImageTk.getimage(image).convert("RGB")
+        self.blit(key, image, x, y)
+
+    def update(self):
+        """
+        Compose the layers if any changed and write the frame to the sink
+        """
+        if self._changed:
+            for surface, img, pos, frame in self._layers.values():
+                self.frame.paste(surface, pos)
+            self._changed = False
+        self.sink.write(self.frame)
+
+    def close(self):
+        self.sink.close()
+
+
+class NullSink(object):
+    """
+    The NullSink class discards all frames, it only counts them
+    """
+    def __init__(self):
+        self.frames = 0
+
+    def write(self, frame):
+        self.frames += 1
+
+    def close(self):
+        return
+
+
+class ArraySink(object):
+    """
+    The ArraySink class copies every frame into a numpy array
+
+    :param array: The array to copy into, allocated on the first frame if not given
+
+    The array holds the last frame (height x width x 3).
+    """
+    def __init__(self, array=None):
+        self.array = array
+        self.frames = 0
+
+    def write(self, frame):
+        if self.array is None:
+            self.array = np.empty((frame.height, frame.width, 3), np.uint8)
+        self.array[...] = np.asarray(frame)
+        self.frames += 1
+
+    def close(self):
+        return
+
+
+class ImageSequenceSink(object):
+    """
+    The ImageSequenceSink class saves every frame as an image file
+
+    :param str pattern: The file name pattern, formatted with the frame number
+
+    .. code-block:: python
+
+       sink = ImageSequenceSink("/tmp/frames/frame_{0:06d}.png")
+    """
+    def __init__(self, pattern="frame_{0:06d}.png"):
+        self.pattern = pattern
+        self.frames = 0
+
+    def write(self, frame):
+        frame.save(self.pattern.format(self.frames))
+        self.frames += 1
+
+    def close(self):
+        return
+
+
+def make_display(display=None, width=800, height=600):
+    """
+    Returns a display for a canvas actor
+
+    :param display: A display instance, "tk", "offscreen" or None to use the SPHOF_DISPLAY environment variable (default "tk")
+    """
+    if display is None:
+        display = os.environ.get("SPHOF_DISPLAY", "tk")
+    if display == "tk":
+        return TkDisplay(width, height)
+    if display == "offscreen":
+        return OffscreenDisplay(width, height)
+    if isinstance(display, str):
+        raise ValueError("Unknown display: {0}".format(display))
+    return display
@@ -0,0 +1,547 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import sys
+import time
+import logging
+import itertools
+import threading
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+"""
+Frame registry (:mod:`frames`)
+==================================
+
+.. currentmodule:: frames
+.. autosummary::
+   :toctree:
+
+   FrameRegistry
+   FrameLink
+   FrameMeta
+"""
+
+
+def frame_nbytes(obj):
+    """
+    Estimate the memory used by a frame in bytes.
+
+    Works for numpy arrays (nbytes) and PIL images (width * height *
+    bands), anything else falls back to sys.getsizeof.
+    """
+    nbytes = getattr(obj, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    size = getattr(obj, "size", None)
+    getbands = getattr(obj, "getbands", None)
+    if getbands is not None and isinstance(size, tuple):
+        return size[0] * size[1] * len(getbands())
+    return sys.getsizeof(obj)
+
+
+class FrameMeta(object):
+    """
+    The FrameMeta class describes the origin of a frame and the actors it
+    passed through. It is stored with the frame in the registry, see
+    :py:meth:`FrameRegistry.info`.
+
+    :param str source: Name of the actor which created the frame
+    :param int seq: Sequence number of the frame at the source
+    :param float origin: time.monotonic() when the frame was created, i.e. captured
+    :param hops: (name, timestamp) of every actor which sent the frame
+
+    An actor sending a frame it derived from a received frame adds
+    itself as a hop:
+
+    .. code-block:: python
+
+       meta = sphof.shared_ns.info(handle)
+       img = sphof.shared_ns.pop(handle)
+       ...
+       out = sphof.shared_ns.put(blurred, meta=meta and meta.hop(self.name()))
+
+    FrameMeta instances are immutable as they are shared by all frames
+    derived from the same source frame.
+    """
+    __slots__ = ("source", "seq", "origin", "hops")
+
+    def __init__(self, source, seq, origin=None, hops=()):
+        self.source = source
+        self.seq = seq
+        self.origin = time.monotonic() if origin is None else origin
+        self.hops = tuple(hops)
+
+    def hop(self, name, timestamp=None):
+        """
+        Returns a copy with the hop of the named actor added
+
+        :param str name: Name of the actor sending the frame
+        :param float timestamp: time.monotonic() of the hop, defaults to now
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        return FrameMeta(self.source, self.seq, self.origin, self.hops + ((name, timestamp),))
+
+    def age(self, now=None):
+        """
+        Returns the seconds since the frame was created
+        """
+        return (time.monotonic() if now is None else now) - self.origin
+
+    def __repr__(self):
+        return "FrameMeta({0!r}, {1!r}, hops={2!r})".format(
+                    self.source, self.seq, [name for name, stamp in self.hops])
+
+
+class _Entry(object):
+    __slots__ = ("obj", "refs", "nbytes", "expires", "on_release", "on_evict", "fetched",
+                 "derived", "meta")
+
+    def __init__(self, obj, refs, nbytes, expires, on_release, meta=None, on_evict=None):
+        self.obj = obj
+        self.refs = refs
+        self.nbytes = nbytes
+        self.expires = expires
+        self.on_release = on_release
+        self.on_evict = on_evict
+        self.fetched = False            # a receiver got the frame
+        self.derived = None             # (op, params) : derived product
+        self.meta = meta                # FrameMeta
+
+
+class _Pending(object):
+    # a derived product being computed by another thread
+    __slots__ = ("event", "value", "failed")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class FrameRegistry(object):
+    """
+    The FrameRegistry class holds frames (images) which are passed
+    between Actors running in the same process. Only a handle to the
+    frame is passed in a signal.
+
+    :param float ttl: Seconds a frame may stay in the registry before it is evicted
+    :param int max_bytes: Maximum bytes held by the registry, the least recently used frames are evicted first
+    :param int max_frames: Maximum number of frames held by the registry
+
+    Every frame gets a unique handle which is never reused. A frame is
+    stored with a reference count, usually the number of subscribers
+    of the emitter. Every receiver calls :py:meth:`.release` (or
+    :py:meth:`.pop`) when done with the frame. The frame is removed when
+    all receivers have released it, when it is older than ttl or when
+    the registry needs room.
+
+    .. code-block:: python
+
+       handle = sphof.shared_ns.put(img, refs=2)   # two subscribers
+       self.emit_signal("imgID", handle)
+
+       # in the receiving Actor
+       img = sphof.shared_ns.pop(handle)
+
+    Products derived from a frame, i.e. a thumbnail, can be cached with
+    the frame using :py:meth:`.derive` so every receiver shares them.
+
+    A frame can carry a :py:class:`FrameMeta` with its sequence number,
+    origin timestamp and hops so receivers can measure its latency, see
+    :py:meth:`.info`.
+
+    The registry also behaves like the dictionary it replaced, so
+    ``sphof.shared_ns[key] = img`` and ``sphof.shared_ns.pop(key)`` still
+    work.
+    """
+    def __init__(self, ttl=5.0, max_bytes=256*1024*1024, max_frames=1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self._entries = OrderedDict()   # handle : _Entry, in LRU order
+        self._nbytes = 0
+        self._handles = itertools.count(1)
+        self._lock = threading.RLock()
+        self._callbacks = deque()       # release callbacks to run outside the lock
+        self.evicted = 0                # number of frames evicted
+        self.derived_hits = 0           # derived products found in the cache
+        self.derived_misses = 0         # derived products computed
+
+    def put(self, obj, refs=1, on_release=None, meta=None, on_evict=None):
+        """
+        Store a frame and return its handle
+
+        :param obj: The frame to store
+        :param int refs: Number of receivers which will release the frame
+        :param on_release: Callable called with the handle and frame when the frame leaves the registry
+        :param FrameMeta meta: The origin of the frame
+        :param on_evict: Callable called instead of on_release when the frame is evicted, a receiver might still use it
+        """
+        handle = self._put(obj, refs, on_release, meta, on_evict)
+        self._run_callbacks()
+        return handle
+
+    def _put(self, obj, refs=1, on_release=None, meta=None, on_evict=None):
+        # store without running the callbacks, the caller has to run them
+        with self._lock:
+            handle = next(self._handles)
+            self._store(handle, obj, refs, on_release, meta, on_evict)
+        return handle
+
+    def info(self, handle):
+        """
+        Returns the :py:class:`FrameMeta` of the frame of the handle or
+        None if the frame has none or is not available anymore. Doesn't
+        release the frame so get the info before popping the frame.
+
+        :param int handle: The handle of the frame
+        """
+        with self._lock:
+            entry = self._entries.get(handle)
+            return entry.meta if entry is not None else None
+
+    def get(self, handle, default=None):
+        """
+        Return the frame of the handle without releasing it
+
+        :param int handle: The handle of the frame
+        """
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return default
+            self._entries.move_to_end(handle)
+            entry.fetched = True
+            return entry.obj
+
+    def acquire(self, handle, refs=1):
+        """
+        Add references to the frame of the handle. Returns False if the
+        frame is not available anymore.
+
+        :param int handle: The handle of the frame
+        :param int refs: The number of references to add
+        """
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return False
+            entry.refs += refs
+            entry.fetched = True
+            return True
+
+    def release(self, handle):
+        """
+        Release a reference to the frame of the handle. The frame is
+        removed when no references are left. Returns False if the frame
+        is not available anymore.
+
+        :param int handle: The handle of the frame
+        """
+        with self._lock:
+            found = self._release(handle)
+        self._run_callbacks()
+        return found
+
+    def pop(self, handle, *default):
+        """
+        Return the frame of the handle and release it. Raises a KeyError
+        if the frame is not available and no default is given.
+
+        :param int handle: The handle of the frame
+        """
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is not None:
+                entry.fetched = True
+                self._release(handle)
+        self._run_callbacks()
+        if entry is None:
+            if default:
+                return default[0]
+            raise KeyError(handle)
+        return entry.obj
+
+    def discard(self, handle):
+        """
+        Remove the frame of the handle regardless of its references
+
+        :param int handle: The handle of the frame
+        """
+        with self._lock:
+            if handle in self._entries:
+                self._remove(handle)
+        self._run_callbacks()
+
+    def revoke(self, handle):
+        """
+        Remove the frame of the handle if no receiver got it yet. Returns
+        True if the frame was removed.
+
+        :param int handle: The handle of the frame
+        """
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None or entry.fetched:
+                return False
+            self._remove(handle)
+        self._run_callbacks()
+        return True
+
+    def derive(self, handle, op, func, *params):
+        """
+        Returns func(frame, *params) for the frame of the handle. The
+        result is computed once and cached with the frame until the frame
+        leaves the registry. Raises a KeyError if the frame is not
+        available.
+
+        :param int handle: The handle of the frame
+        :param str op: The name of the operation, the cache key is (op, params)
+        :param func: Callable computing the product from the frame
+        :param params: Extra arguments of func, must be hashable
+
+        .. code-block:: python
+
+           thumb = sphof.shared_ns.derive(handle, "resize", cv2.resize, (120, 90))
+           sphof.shared_ns.release(handle)
+
+        .. warning::
+            Every receiver gets the same object, don't modify it. Send
+            a copy when passing it on to other actors.
+        """
+        key = (op,) + params
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                raise KeyError(handle)
+            entry.fetched = True
+            if entry.derived is None:
+                entry.derived = {}
+            product = entry.derived.get(key)
+            if product is not None and not isinstance(product, _Pending):
+                self.derived_hits += 1
+                return product
+            if product is None:
+                pending = _Pending()
+                entry.derived[key] = pending
+                self.derived_misses += 1
+            else:
+                self.derived_hits += 1
+            frame = entry.obj
+        if product is not None:
+            # another thread is computing it
+            product.event.wait()
+            if not product.failed:
+                return product.value
+            return func(frame, *params)
+        try:
+            value = func(frame, *params)
+        except Exception:
+            with self._lock:
+                if entry.derived:
+                    entry.derived.pop(key, None)
+            pending.failed = True
+            pending.event.set()
+            raise
+        with self._lock:
+            if entry.derived is not None and self._entries.get(handle) is entry:
+                entry.derived[key] = value
+                nbytes = frame_nbytes(value)
+                entry.nbytes += nbytes
+                self._nbytes += nbytes
+        pending.value = value
+        pending.event.set()
+        return value
+
+    def evict(self):
+        """
+        Remove all frames older than the ttl. Returns the number of frames
+        evicted.
+        """
+        with self._lock:
+            evicted = self._evict_expired()
+        self._run_callbacks()
+        return evicted
+
+    def nbytes(self):
+        """
+        Returns the number of bytes held by the registry
+        """
+        with self._lock:
+            return self._nbytes
+
+    def clear(self):
+        """
+        Remove all frames
+        """
+        with self._lock:
+            for handle in list(self._entries):
+                self._remove(handle)
+        self._run_callbacks()
+
+    def _release(self, handle):
+        entry = self._entries.get(handle)
+        if entry is None:
+            return False
+        entry.refs -= 1
+        if entry.refs <= 0:
+            self._remove(handle)
+        return True
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [handle for handle, entry in self._entries.items()
+                            if entry.expires <= now]
+        for handle in expired:
+            self._evict(handle)
+        return len(expired)
+
+    def _store(self, handle, obj, refs, on_release, meta=None, on_evict=None):
+        if handle in self._entries:
+            self._remove(handle)
+        nbytes = frame_nbytes(obj)
+        expires = time.monotonic() + self.ttl
+        self._evict_expired()
+        self._entries[handle] = _Entry(obj, refs, nbytes, expires, on_release, meta, on_evict)
+        self._nbytes += nbytes
+        # evict least recently used frames if we're over budget but
+        # always keep the frame just stored
+        while len(self._entries) > 1 and (self._nbytes > self.max_bytes
+                                    or len(self._entries) > self.max_frames):
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, handle):
+        logger.debug("Evicting frame {0}".format(handle))
+        self.evicted += 1
+        self._remove(handle, True)
+
+    def _remove(self, handle, evicted=False):
+        entry = self._entries.pop(handle)
+        self._nbytes -= entry.nbytes
+        entry.derived = None
+        callback = entry.on_evict if evicted and entry.on_evict else entry.on_release
+        if callback:
+            # the callback may take other locks, i.e. of a FrameLink which
+            # calls us with its lock held, so it runs after we let go
+            self._callbacks.append((callback, handle, entry.obj))
+
+    def _run_callbacks(self):
+        while True:
+            try:
+                on_release, handle, obj = self._callbacks.popleft()
+            except IndexError:
+                return
+            try:
+                on_release(handle, obj)
+            except Exception as e:
+                logger.warning("Release callback of frame {0} failed: {1}".format(handle, e))
+
+    # dictionary interface of the old shared_ns
+    def __setitem__(self, key, obj):
+        with self._lock:
+            self._store(key, obj, 1, None)
+        self._run_callbacks()
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._entries[key].obj
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key not in self._entries:
+                raise KeyError(key)
+            self._remove(key)
+        self._run_callbacks()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+
+class FrameLink(object):
+    """
+    The FrameLink class provides flow control for frames sent by one
+    emitter, i.e. the 'imgID' emitter of a PainterActor.
+
+    :param FrameRegistry registry: The registry to store the frames in
+    :param int window: The maximum number of frames in flight
+    :param bool latest_only: Replace frames no receiver got yet by newer frames
+
+    A frame is in flight from :py:meth:`.send` until all receivers
+    released it. When the window is full :py:meth:`.send` refuses the
+    frame so the producer can skip the work of creating frames nobody
+    will display. With latest_only the frames no receiver picked up yet
+    are dropped in favour of the new frame.
+    """
+    def __init__(self, registry, window=2, latest_only=False):
+        self.registry = registry
+        self.window = window
+        self.latest_only = latest_only
+        self._in_flight = OrderedDict() # handle : (on_release, on_evict)
+        self._lock = threading.RLock()
+        self.sent = 0                   # frames sent
+        self.dropped = 0                # frames refused or dropped
+
+    def credits(self):
+        """
+        Returns the number of frames which can be sent before the window
+        is full
+        """
+        return max(self.window - len(self._in_flight), 0)
+
+    def in_flight(self):
+        """
+        Returns the number of frames in flight
+        """
+        return len(self._in_flight)
+
+    def send(self, obj, refs=1, on_release=None, meta=None, on_evict=None):
+        """
+        Store the frame in the registry if the window allows it. Returns
+        the handle of the frame or None if the frame was refused.
+
+        :param obj: The frame to store
+        :param int refs: Number of receivers which will release the frame
+        :param on_release: Callable called with the handle and frame when the frame leaves the registry
+        :param FrameMeta meta: The origin of the frame
+        :param on_evict: Callable called instead of on_release when the frame is evicted
+        """
+        # the registry runs the callbacks of any link when it is changed,
+        # never change it while holding our lock
+        revoked = 0
+        if self.latest_only:
+            with self._lock:
+                handles = list(self._in_flight)
+            revoked = sum(1 for handle in handles if self.registry.revoke(handle))
+        with self._lock:
+            self.dropped += revoked
+            if not self.credits():
+                self.dropped += 1
+                return None
+            # register the handle before any callback of it can run
+            handle = self.registry._put(obj, refs, self._released, meta, self._evicted)
+            self._in_flight[handle] = (on_release, on_evict)
+            self.sent += 1
+        self.registry._run_callbacks()
+        return handle
+
+    def _released(self, handle, obj, evicted=False):
+        with self._lock:
+            on_release, on_evict = self._in_flight.pop(handle, (None, None))
+        if evicted and on_evict:
+            on_evict(handle, obj)
+        elif on_release:
+            on_release(handle, obj)
+
+    def _evicted(self, handle, obj):
+        self._released(handle, obj, True)
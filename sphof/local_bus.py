@@ -0,0 +1,244 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import socket
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+"""
+In-process transport (:mod:`local_bus`)
+=======================================
+
+.. currentmodule:: local_bus
+.. autosummary::
+   :toctree:
+
+   LocalBus
+   LocalInbox
+"""
+
+# messages are (kind, peer, name, data, receiver) tuples
+SIG = 0         # a signal, data is [emitter, value]
+SUB = 1         # a subscription, data is [emitter, receiver]
+ENTER = 2       # a peer entered, data is the headers
+EXIT = 3        # a peer left, data is None
+
+
+class LocalInbox(object):
+    """
+    The LocalInbox class queues the signals sent to an actor by actors
+    in the same process.
+
+    :param notify: Callable called when a message arrives in an empty inbox, if not given the inbox can be polled
+
+    Any thread can :py:meth:`.put` a message. The receiving actor waits
+    on the inbox by polling its :py:meth:`.fileno` together with its
+    ZOCP socket and handles the messages returned by :py:meth:`.drain`.
+    """
+    def __init__(self, notify=None):
+        self._queue = deque()
+        self._notify = notify
+        self._reader = self._writer = None
+        if notify is None:
+            self._reader, self._writer = socket.socketpair()
+            self._reader.setblocking(False)
+            self._writer.setblocking(False)
+        self.closed = False
+
+    def put(self, msg):
+        """
+        Queue a message and wake up the receiver
+        """
+        if self.closed:
+            return
+        self._queue.append(msg)
+        # only the first message needs to wake up the receiver, it
+        # drains the whole queue
+        if len(self._queue) == 1:
+            if self._notify:
+                self._notify()
+                return
+            try:
+                self._writer.send(b"\0")
+            except OSError:
+                pass
+
+    def drain(self):
+        """
+        Returns all queued messages
+        """
+        if self._reader:
+            try:
+                while self._reader.recv(4096):
+                    pass
+            except OSError:
+                pass
+        msgs = []
+        while self._queue:
+            msgs.append(self._queue.popleft())
+        return msgs
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def close(self):
+        """
+        Stop accepting messages and wake up the receiver. The receiver
+        might still be waiting on the sockets, its loop closes them with
+        :py:meth:`.close_sockets` once it exits.
+        """
+        self.closed = True
+        self._queue.clear()
+        if self._writer:
+            try:
+                self._writer.send(b"\0")
+            except OSError:
+                pass
+
+    def close_sockets(self):
+        """
+        Close the sockets of a closed inbox. Only call this from the
+        receiver after it stopped polling them.
+        """
+        self.close()
+        for sock in (self._reader, self._writer):
+            if sock:
+                sock.close()
+
+    def __len__(self):
+        return len(self._queue)
+
+
+class LocalBus(object):
+    """
+    The LocalBus class keeps track of the actors running in this process
+    by their uuid.
+
+    When an actor subscribes to an emitter of an actor in the same
+    process the subscription is recorded on the bus instead of being sent
+    over the network. Signals of that emitter are then put in the
+    receiver's :py:class:`LocalInbox` without serialization. Remote
+    peers keep using ZOCP.
+
+    .. note::
+        Values are passed by reference, a local receiver gets the same
+        object as the emitter emitted.
+    """
+    def __init__(self):
+        self._actors = {}       # uuid : actor
+        self._emitters = {}     # uuid : {actor: emitters} the actor is subscribed to
+        self._lock = threading.Lock()
+
+    def register(self, actor):
+        """
+        Register an actor running in this process
+        """
+        with self._lock:
+            self._actors[actor.uuid()] = actor
+
+    def unregister(self, actor):
+        """
+        Remove an actor from the bus and all its local subscriptions
+        """
+        with self._lock:
+            self._actors.pop(actor.uuid(), None)
+            # only the emitters it subscribed to know about it
+            for other, emitters in self._emitters.pop(actor.uuid(), {}).items():
+                subscribers = dict(other._local_subscribers)
+                for emitter in emitters:
+                    subscribers[emitter] = tuple(sub for sub in subscribers.get(emitter, ())
+                                                 if sub[0] is not actor)
+                other._local_subscribers = subscribers
+
+    def get(self, uuid):
+        """
+        Returns the local actor with the given uuid or None
+        """
+        return self._actors.get(uuid)
+
+    def subscribe(self, recv_actor, receiver, emit_actor, emitter):
+        """
+        Subscribe the receiver of recv_actor to the emitter of emit_actor
+        """
+        with self._lock:
+            subs = emit_actor._local_subscribers.get(emitter, ())
+            if (recv_actor, receiver) not in subs:
+                # copy on write, the emitter iterates without the lock
+                subscribers = dict(emit_actor._local_subscribers)
+                subscribers[emitter] = subs + ((recv_actor, receiver),)
+                emit_actor._local_subscribers = subscribers
+                self._emitters.setdefault(recv_actor.uuid(), {}).setdefault(
+                    emit_actor, set()).add(emitter)
+        peer, name = recv_actor._local_peer
+        emit_actor._local_inbox.put((SUB, peer, name, [emitter, receiver], None))
+
+    def subscribe_peers(self, recv_peer, receiver, emit_peer, emitter):
+        """
+        Subscribe the receiver of recv_peer to the emitter of emit_peer
+        if both peers are actors in this process. Returns False if they
+        aren't, the subscription has to go through ZOCP.
+        """
+        recv_actor = self._actors.get(recv_peer)
+        emit_actor = self._actors.get(emit_peer)
+        if recv_actor is None or emit_actor is None:
+            return False
+        self.subscribe(recv_actor, receiver, emit_actor, emitter)
+        return True
+
+    def unsubscribe_peers(self, recv_peer, receiver, emit_peer, emitter):
+        """
+        Remove the subscription of the receiver of recv_peer to the
+        emitter of emit_peer, see :py:meth:`.subscribe_peers`
+        """
+        recv_actor = self._actors.get(recv_peer)
+        emit_actor = self._actors.get(emit_peer)
+        if recv_actor is None or emit_actor is None:
+            return False
+        self.unsubscribe(recv_actor, receiver, emit_actor, emitter)
+        return True
+
+    def unsubscribe(self, recv_actor, receiver, emit_actor, emitter):
+        """
+        Remove the subscription of the receiver of recv_actor to the
+        emitter of emit_actor
+        """
+        with self._lock:
+            subscribers = dict(emit_actor._local_subscribers)
+            subscribers[emitter] = tuple(sub for sub in subscribers.get(emitter, ())
+                                         if sub != (recv_actor, receiver))
+            emit_actor._local_subscribers = subscribers
+
+    def emit(self, actor, emitter, value):
+        """
+        Send a signal of the emitter of actor to its local subscribers
+        """
+        subscribers = actor._local_subscribers.get(emitter)
+        if subscribers:
+            peer, name = actor._local_peer
+            for recv_actor, receiver in subscribers:
+                recv_actor._local_inbox.put((SIG, peer, name, [emitter, value], receiver))
+
+    def dispatch(self, actor, msgs):
+        """
+        Call the on_peer methods of actor for the messages from its inbox
+        """
+        for kind, peer, name, data, receiver in msgs:
+            if kind == SIG:
+                capability = actor.capability.get(receiver)
+                if capability is not None:
+                    capability['value'] = data[1]
+                actor.on_peer_signaled(peer, name, data)
+            elif kind == SUB:
+                actor.on_peer_subscribed(peer, name, data)
+            elif kind == ENTER:
+                actor.on_peer_enter(peer, name, data)
+            elif kind == EXIT:
+                actor.on_peer_exit(peer, name)
+
+    def __len__(self):
+        return len(self._actors)
+
+
+local_bus = LocalBus()
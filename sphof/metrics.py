@@ -0,0 +1,323 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import time
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+"""
+Actor metrics (:mod:`metrics`)
+==============================
+
+.. currentmodule:: metrics
+.. autosummary::
+   :toctree:
+
+   Histogram
+   ActorMetrics
+   LatencyTracker
+"""
+
+# bucket upper bounds in seconds from 1µs up to ~17 minutes, every
+# doubling is split in 8 buckets so a percentile is off by 9% at most
+_STEPS = 8
+_BOUNDS = [1e-6 * 2**(i / float(_STEPS)) for i in range(30 * _STEPS + 1)]
+
+
+class Histogram(object):
+    """
+    The Histogram class records durations in buckets from 1µs, every
+    doubling of the duration is split in 8 buckets. It keeps the count,
+    sum, minimum and maximum so it's cheap to record into from a loop.
+    Any thread can record into it.
+    """
+    def __init__(self):
+        self.buckets = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        """
+        Record a value (seconds)
+        """
+        i = bisect.bisect_left(_BOUNDS, value)
+        with self._lock:
+            self.buckets[i] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def mean(self):
+        """
+        Returns the mean of the recorded values
+        """
+        return self.total / self.count if self.count else 0.
+
+    def percentile(self, p):
+        """
+        Returns an estimate of the p-th percentile (0-100), the upper
+        bound of the bucket containing it limited by the maximum
+        """
+        with self._lock:
+            return self._percentile(p)
+
+    def _percentile(self, p):
+        if not self.count:
+            return 0.
+        rank = p / 100. * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                bound = _BOUNDS[i] if i < len(_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        """
+        Returns a summary of the histogram
+        """
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean": self.total / self.count if self.count else 0.,
+                "min": self.min or 0.,
+                "max": self.max or 0.,
+                "p50": self._percentile(50),
+                "p90": self._percentile(90),
+                "p99": self._percentile(99),
+            }
+
+
+class _Timer(object):
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+
+
+class ActorMetrics(object):
+    """
+    The ActorMetrics class collects the performance metrics of an actor:
+
+    * histograms of durations, i.e. of the update and draw methods
+    * counters, i.e. the number of frames sent
+    * gauges, the last value of something, i.e. the number of images in flight
+
+    Every actor has a metrics attribute. The actor loop records the
+    durations of pre_update, update, post_update, pre_draw, draw,
+    post_draw, the whole frame and run_once. You can add your own:
+
+    .. code-block:: python
+
+       with self.metrics.timer("blur"):
+           img = self.blur(img)
+       self.metrics.count("blurred")
+
+    Use :py:meth:`.to_dict` to query the metrics or :py:meth:`.dump` to
+    write them to a file.
+    """
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.monotonic()
+        self._summarized = (self.started, 0)    # time and frame count of the last summary
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """
+        Record a duration in the histogram of the given name
+        """
+        hist = self.histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(name, Histogram())
+        hist.record(seconds)
+
+    def timer(self, name):
+        """
+        Returns a context manager recording the duration of its block in
+        the histogram of the given name
+        """
+        return _Timer(self, name)
+
+    def count(self, name, n=1):
+        """
+        Increment the counter of the given name
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        """
+        Set the gauge of the given name
+        """
+        self.gauges[name] = value
+
+    def reset(self):
+        """
+        Clear all metrics
+        """
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.gauges = {}
+            self.started = time.monotonic()
+            self._summarized = (self.started, 0)
+
+    def to_dict(self):
+        """
+        Returns all metrics as a dictionary
+        """
+        with self._lock:
+            return {
+                "elapsed": time.monotonic() - self.started,
+                "histograms": dict((name, hist.to_dict())
+                                   for name, hist in self.histograms.items()),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def to_json(self):
+        """
+        Returns all metrics as a JSON string
+        """
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    def dump(self, path):
+        """
+        Append the metrics as a JSON line to the file at path
+        """
+        with open(path, "a") as f:
+            f.write(self.to_json() + "\n")
+
+    def summary(self):
+        """
+        Returns a one line summary of the frame rate since the previous
+        summary and the frame durations
+        """
+        now = time.monotonic()
+        frame = self.histograms.get("frame", Histogram())
+        count = frame.count
+        since, counted = self._summarized
+        self._summarized = (now, count)
+        elapsed = now - since
+        return "fps: {0:.1f} frame: mean {1:.2f}ms p99 {2:.2f}ms missed: {3}".format(
+                    (count - counted) / elapsed if elapsed else 0.,
+                    frame.mean() * 1000, frame.percentile(99) * 1000,
+                    self.gauges.get("missed", 0))
+
+
+class LatencyTracker(object):
+    """
+    The LatencyTracker class records the latency of frames per source
+    from the :py:class:`sphof.frames.FrameMeta` of the frames, i.e. the
+    capture to display latency of a camera frame.
+
+    :param ActorMetrics metrics: The metrics to record into, i.e. the metrics of an actor
+
+    For every source it records the latency from the origin of the frame
+    to the end, named 'latency:<source>', and the time spent in every
+    hop, named 'latency:<source>:<hop>'. The time of a hop is measured
+    from the previous hop (or the origin) so the slowest hop stands out:
+
+    .. code-block:: python
+
+       meta = sphof.shared_ns.info(handle)
+       ...
+       self.latency.record(meta, "display")
+       self.latency.slowest(meta.source)     # ('BlurActor', 0.012)
+    """
+    def __init__(self, metrics=None):
+        self.metrics = ActorMetrics() if metrics is None else metrics
+        self._hops = {}                 # source : hop names in order of the chain
+
+    def record(self, meta, end="end", now=None):
+        """
+        Record the latency of a frame
+
+        :param FrameMeta meta: The meta of the frame
+        :param str end: Name of the last hop, i.e. 'display'
+        :param float now: time.monotonic() at the end, defaults to now
+        """
+        if now is None:
+            now = time.monotonic()
+        prefix = "latency:" + meta.source
+        self.metrics.record(prefix, now - meta.origin)
+        names = self._hops.get(meta.source)
+        if names is None:
+            names = self._hops.setdefault(meta.source, [])
+        last = meta.origin
+        for name, stamp in meta.hops + ((end, now),):
+            if name not in names:
+                names.append(name)
+            self.metrics.record(prefix + ":" + name, stamp - last)
+            last = stamp
+
+    def sources(self):
+        """
+        Returns the names of the sources recorded
+        """
+        return list(self._hops)
+
+    def to_dict(self):
+        """
+        Returns the latency statistics of every source:
+        {source: {'total': stats, 'hops': [(hop, stats), ...]}}
+        """
+        histograms = self.metrics.to_dict()["histograms"]
+        result = {}
+        for source, names in list(self._hops.items()):
+            prefix = "latency:" + source
+            result[source] = {
+                "total": histograms.get(prefix, Histogram().to_dict()),
+                "hops": [(name, histograms[prefix + ":" + name]) for name in list(names)
+                            if prefix + ":" + name in histograms],
+            }
+        return result
+
+    def slowest(self, source, p=99):
+        """
+        Returns (hop, seconds) of the hop of the source with the highest
+        p-th percentile or None if nothing was recorded
+        """
+        prefix = "latency:" + source
+        worst = None
+        for name in list(self._hops.get(source, ())):
+            hist = self.metrics.histograms.get(prefix + ":" + name)
+            if hist is None:
+                continue
+            value = hist.percentile(p)
+            if worst is None or value > worst[1]:
+                worst = (name, value)
+        return worst
+
+    def summary(self, source):
+        """
+        Returns a one line summary of the latency of the source
+        """
+        total = self.metrics.histograms.get("latency:" + source, Histogram())
+        line = "latency {0}: p50 {1:.2f}ms p99 {2:.2f}ms".format(
+                    source, total.percentile(50) * 1000, total.percentile(99) * 1000)
+        worst = self.slowest(source)
+        if worst:
+            line += " slowest hop: {0} p99 {1:.2f}ms".format(worst[0], worst[1] * 1000)
+        return line
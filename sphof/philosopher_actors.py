@@ -1,28 +1,76 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-import time
 import logging
 import random
 import csv
-import sphof
-from sphof import Actor, LeadActor, LoneActor
+import threading
+from .actors import Actor, LeadActor, LoneActor
+from .pool import PooledActor
+from .philosopher_table import PhilosopherTable
 
 logger = logging.getLogger(__name__)
+
+"""
+Philosopher Actors (:mod:`philosopher_actors`)
+==============================================
+
+.. currentmodule:: philosopher_actors
+.. autosummary::
+   :toctree:
+
+   PhilosopherActor
+   LonePhilosopherActor
+   DiningPhilosopherActor
+   PooledPhilosopherActor
+   PhilosopherTable
+   Waiter
+"""
+
 import os
 this_dir, this_filename = os.path.split(__file__)
 DATA_PATH = os.path.join(this_dir, "quotes.csv")
 
+_quotes = None                  # the quotes, shared by all philosophers
+_quotes_lock = threading.Lock()
+
+# used when quotes.csv is missing
+FALLBACK_QUOTES = (
+    "The unexamined life is not worth living.",
+    "I think, therefore I am.",
+    "The only thing I know is that I know nothing.",
+    "Man is condemned to be free.",
+    "He who has a why to live can bear almost any how.",
+    "Whereof one cannot speak, thereof one must be silent.",
+    "No man ever steps in the same river twice.",
+    "Happiness depends upon ourselves.",
+)
+
+def load_quotes():
+    """
+    Returns a tuple of all quotes in quotes.csv. The file is only read
+    once per process, every philosopher shares the same tuple. If the
+    file can't be read FALLBACK_QUOTES is returned.
+    """
+    global _quotes
+    if _quotes is None:
+        with _quotes_lock:
+            if _quotes is None:
+                try:
+                    with open(DATA_PATH) as quotes:
+                        quotes_reader = csv.reader(quotes, delimiter=';')
+                        _quotes = tuple(row[0] for row in quotes_reader if row)
+                except OSError as e:
+                    logger.warning("Can't read quotes, using the built-in ones: {0}".format(e))
+                if not _quotes:
+                    _quotes = FALLBACK_QUOTES
+    return _quotes
+
 class Philosopher(object):
     """
     The Philospher class provides the think and eat method.
     """
     def __init__(self, *args, **kwargs):
-        self.quotes = []
-        with open(DATA_PATH) as quotes:
-            quotes_reader = csv.reader(quotes, delimiter=';')
-            for row in quotes_reader:
-                self.quotes.append(row[0])
-        quotes.close()
+        self.quotes = load_quotes()
         self.topics = []                      # food for thought
         super(Philosopher, self).__init__(*args, **kwargs)        
 
@@ -50,8 +98,7 @@ class Philosopher(object):
         The eat method makes the philosopher eat. This fills its list
         of topics for thinking (food for thought)
         """
-        idx = random.randint(0,len(self.quotes)-1)
-        self.topics.append(self.quotes[idx])
+        self.topics.append(random.choice(self.quotes))
         #time.sleep(0.1)                 # crunch
 
     def _get_text(self):
@@ -70,3 +117,142 @@ class LonePhilosopherActor(Philosopher, LoneActor):
     def __init__(self, *args, **kwargs):
         super(LonePhilosopherActor, self).__init__(*args, **kwargs)
 
+
+# the states a dining philosopher emits
+HUNGRY = "HUNGRY"
+EATING = "EATING"
+THINKING = "THINKING"
+
+
+class DiningPhilosopher(Philosopher):
+    """
+    The DiningPhilosopher class adds the protocol of a :py:class:`Waiter`
+    to the Philosopher: it emits its state on the 'state' emitter and
+    eats when it receives a signal on its 'grant' sensor.
+
+    A hungry philosopher waits for the grant, eats until it has appetite
+    topics, then thinks until it is out of topics and gets hungry again.
+    """
+    appetite = 100          # topics eaten per meal
+    verbose = False         # print what the philosopher is doing
+
+    def setup(self):
+        self.register_int("grant", 0, "rs")
+        self.register_string("state", HUNGRY, "re")
+
+    def update(self):
+        state = self.get_value("state")
+        if state == HUNGRY:
+            return
+        elif state == EATING:
+            self.eat()
+            if len(self.topics) >= self.appetite:
+                self.emit_signal("state", THINKING)
+                if self.verbose:
+                    print("{0}:Hmmmmm... let me think...{1}".format(self.name(), len(self.topics)))
+        elif not self.topics:
+            self.emit_signal("state", HUNGRY)
+            if self.verbose:
+                print("{0}:I need foooooood...{1}".format(self.name(), len(self.topics)))
+        else:
+            enlightenment = self.think()
+            if enlightenment and self.verbose:
+                print("{0}:Eureka:{1}".format(self.name(), enlightenment))
+
+    def on_peer_signaled(self, peer, name, data, *args, **kwargs):
+        # the grant is the only signal we subscribe to
+        if data[1] and self.get_value("state") == HUNGRY:
+            if self.verbose:
+                print("{0}:Jay food, eating....{1}".format(self.name(), len(self.topics)))
+            self.emit_signal("state", EATING)
+
+    def on_peer_subscribed(self, peer, name, data, *args, **kwargs):
+        if data[0] == "state":
+            # tell the waiter our state
+            self.emit_signal("state", self.get_value("state"))
+
+
+class DiningPhilosopherActor(DiningPhilosopher, Actor):
+    """
+    The DiningPhilosopherActor class is a philosopher served by a
+    :py:class:`Waiter`, running in its own thread
+    """
+    def __init__(self, *args, **kwargs):
+        super(DiningPhilosopherActor, self).__init__(*args, **kwargs)
+
+
+class PooledPhilosopherActor(DiningPhilosopher, PooledActor):
+    """
+    The PooledPhilosopherActor class is a philosopher served by a
+    :py:class:`Waiter`, running on the pool of the Waiter. Use it for
+    tables with thousands of seats.
+    """
+    def __init__(self, *args, **kwargs):
+        super(PooledPhilosopherActor, self).__init__(*args, **kwargs)
+
+
+class Waiter(LeadActor):
+    """
+    The Waiter class seats philosophers at a :py:class:`PhilosopherTable`
+    and hands out the chopsticks.
+
+    :param str name: Name of the node, if not given a random name will be created
+
+    Set the number of seats, the policy of the table and the class of
+    the philosophers as class attributes:
+
+    .. code-block:: python
+
+       class BigTable(Waiter):
+           seats = 5000
+           policy = "greedy"
+           philosopher_class = PooledPhilosopherActor
+
+    The Waiter subscribes to the 'state' emitter of every philosopher
+    with its 'state' sensor and emits a single grant signal to a
+    philosopher when it may eat, on the emitter of its seat.
+    """
+    seats = 5
+    policy = "fair"
+    philosopher_class = DiningPhilosopherActor
+    names = ("Descartes", "Plato", "Aristotle", "Socrates", "Kant")
+
+    def setup(self):
+        self.table = PhilosopherTable(self.seats, self.policy)
+        self.register_string("state", "", "rs")
+        self._emitters = ["seat{0}".format(seat) for seat in range(self.seats)]
+        for emitter in self._emitters:
+            self.register_int(emitter, 0, "re")
+        self._seat_of = {}                      # name : seat
+        for seat in range(self.seats):
+            name = self.seat_name(seat)
+            self._seat_of[name] = seat
+            self.add_actor(self.philosopher_class(name))
+
+    def seat_name(self, seat):
+        """
+        Returns the name of the philosopher at the seat
+        """
+        if self.seats <= len(self.names):
+            return self.names[seat]
+        return "{0}{1}".format(self.names[seat % len(self.names)], seat)
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        seat = self._seat_of.get(name)
+        if seat is not None:
+            # the grant first, the philosopher sends its state when we
+            # subscribe to it
+            self.signal_subscribe(peer, "grant", self.uuid(), self._emitters[seat])
+            self.signal_subscribe(self.uuid(), "state", peer, "state")
+
+    def on_peer_signaled(self, peer, name, data, *args, **kwargs):
+        seat = self._seat_of.get(name)
+        if seat is None:
+            return
+        if data[1] == HUNGRY:
+            if self.table.request(seat):
+                self.emit_signal(self._emitters[seat], 1)
+        elif data[1] == THINKING:
+            for neighbour in self.table.release(seat):
+                self.emit_signal(self._emitters[neighbour], 1)
+
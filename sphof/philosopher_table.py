@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+The table of the dining philosophers, it does not depend on ZOCP so it
+can be used and tested on its own.
+"""
+from array import array
+
+
+# states of a seat
+_THINKING = 0
+_HUNGRY = 1
+_EATING = 2
+
+
+class PhilosopherTable(object):
+    """
+    The PhilosopherTable class decides which philosopher may eat. It
+    only keeps arrays of bytes and counters so a table can have
+    thousands of seats.
+
+    :param int seats: Number of seats, at least 2
+    :param str policy: 'fair' or 'greedy', see below
+
+    Seat i uses chopstick i on its left and chopstick i + 1 on its right.
+    A request or release only looks at the seat and its two neighbours
+    so it takes the same time for any number of seats.
+
+    With the 'greedy' policy a hungry philosopher eats as soon as both
+    chopsticks are free. This gives the most meals but a philosopher can
+    starve when its neighbours keep eating. With the 'fair' policy a
+    philosopher doesn't eat again while a neighbour is still waiting
+    since before its last meal, so every philosopher eats eventually.
+
+    .. code-block:: python
+
+       table = PhilosopherTable(1000)
+       if table.request(seat):
+           ...                         # seat may eat
+       for neighbour in table.release(seat):
+           ...                         # neighbour may eat
+    """
+    policies = ("fair", "greedy")
+
+    def __init__(self, seats, policy="fair"):
+        if seats < 2:
+            raise ValueError("A table needs at least 2 seats")
+        if policy not in self.policies:
+            raise ValueError("Unknown policy: {0}".format(policy))
+        self.seats = seats
+        self.policy = policy
+        self.chopsticks = bytearray(seats)      # 1 if in use
+        self.state = bytearray(seats)
+        self.since = array("Q", [0]) * seats    # ticket of the request of a seat
+        self.last = array("Q", [0]) * seats     # ticket of the last meal of a seat
+        self.meals = array("L", [0]) * seats
+        self._ticket = 0
+        self.grants = 0
+
+    def request(self, seat):
+        """
+        A philosopher is hungry. Returns True if it may eat now,
+        otherwise it is granted in a later :py:meth:`.release` of a
+        neighbour.
+
+        :param int seat: The seat of the philosopher
+        """
+        state = self.state[seat]
+        if state != _THINKING:
+            return state == _EATING
+        self.state[seat] = _HUNGRY
+        self._ticket += 1
+        self.since[seat] = self._ticket
+        return self._grant(seat)
+
+    def release(self, seat):
+        """
+        A philosopher stops eating. Returns the seats of the neighbours
+        which may eat now.
+
+        :param int seat: The seat of the philosopher
+        """
+        state = self.state[seat]
+        self.state[seat] = _THINKING
+        if state != _EATING:
+            return []
+        right = seat + 1 if seat + 1 < self.seats else 0
+        left = seat - 1 if seat else self.seats - 1
+        self.chopsticks[seat] = 0
+        self.chopsticks[right] = 0
+        # the neighbour waiting longest first, they share a chopstick
+        # at a table of 3 or less
+        first, second = left, right
+        if self.since[right] < self.since[left]:
+            first, second = right, left
+        granted = []
+        if self.state[first] == _HUNGRY and self._grant(first):
+            granted.append(first)
+        if second != first and self.state[second] == _HUNGRY and self._grant(second):
+            granted.append(second)
+        return granted
+
+    def eating(self, seat):
+        """
+        Returns True if the philosopher at the seat is eating
+        """
+        return self.state[seat] == _EATING
+
+    def _grant(self, seat):
+        right = seat + 1 if seat + 1 < self.seats else 0
+        if self.chopsticks[seat] or self.chopsticks[right]:
+            return False
+        if self.policy == "fair":
+            # let a neighbour go first which waited during our last meal
+            left = seat - 1 if seat else self.seats - 1
+            last = self.last[seat]
+            if (self.state[left] == _HUNGRY and self.since[left] < last) or \
+                    (self.state[right] == _HUNGRY and self.since[right] < last):
+                return False
+        self.chopsticks[seat] = 1
+        self.chopsticks[right] = 1
+        self.state[seat] = _EATING
+        self._ticket += 1
+        self.last[seat] = self._ticket
+        self.meals[seat] += 1
+        self.grants += 1
+        return True
+
+    def stats(self):
+        """
+        Returns the number of seats, meals and philosophers eating and
+        hungry. The spread between min_meals and max_meals shows how
+        fair the table is.
+        """
+        return {
+            "seats": self.seats,
+            "policy": self.policy,
+            "meals": self.grants,
+            "min_meals": min(self.meals),
+            "max_meals": max(self.meals),
+            "eating": self.state.count(_EATING),
+            "hungry": self.state.count(_HUNGRY),
+        }
@@ -0,0 +1,338 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import sphof
+from .actors import ReactiveActor
+from .metrics import ActorMetrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+Image pipelines (:mod:`pipeline`)
+=================================
+
+.. currentmodule:: pipeline
+.. autosummary::
+   :toctree:
+
+   Stage
+   Pipeline
+   PipelineActor
+"""
+
+SOURCE = "source"       # the name of the input of a pipeline
+
+
+def resize(img, width, height):
+    return cv2.resize(img, (width, height))
+
+
+def invert(img):
+    return 255 - img
+
+
+def blur(img, size=5):
+    kernel = np.ones((size, size), np.float32) / (size * size)
+    return cv2.filter2D(img, -1, kernel)
+
+
+def to_hsv(img):
+    return cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+
+
+def to_gray(img):
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def blend(*imgs):
+    """
+    Returns the average of the given images
+    """
+    return (sum(img.astype(np.uint16) for img in imgs) // len(imgs)).astype(np.uint8)
+
+
+OPS = {
+    "resize": resize,
+    "invert": invert,
+    "blur": blur,
+    "hsv": to_hsv,
+    "gray": to_gray,
+    "blend": blend,
+}
+
+
+def register_op(name, func):
+    """
+    Make a function available to pipeline configurations under the given
+    name
+
+    :param str name: The name of the operation
+    :param func: Callable taking the input frames and the stage's params
+    """
+    OPS[name] = func
+
+
+class Stage(object):
+    """
+    The Stage class is a node of a :py:class:`Pipeline`.
+
+    :param str name: Name of the stage, other stages use it as input
+    :param func: Callable called with the frames of the inputs and the params
+    :param inputs: Names of the stages providing the input frames, 'source' is the input of the pipeline
+    :param params: Keyword arguments passed to func
+    """
+    def __init__(self, name, func, inputs=(SOURCE,), **params):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = params
+
+    def __repr__(self):
+        return "Stage({0!r}, inputs={1!r})".format(self.name, self.inputs)
+
+
+class Pipeline(object):
+    """
+    The Pipeline class runs a graph of image processing stages on a pool
+    of worker threads.
+
+    :param stages: The :py:class:`Stage` instances
+    :param int workers: Number of worker threads
+
+    A stage runs as soon as all its inputs are done, so independent
+    stages (a fan-out) run concurrently. A stage with several inputs (a
+    fan-in) gets all their frames. Frames are passed by reference, a
+    stage must not modify its input frames.
+
+    .. code-block:: python
+
+       pipeline = Pipeline.from_config([
+           {"name": "thumb", "op": "resize", "params": {"width": 120, "height": 90}},
+           {"name": "blur", "op": "blur", "inputs": ["thumb"]},
+           {"name": "invert", "op": "invert", "inputs": ["thumb"]},
+           {"name": "mix", "op": "blend", "inputs": ["blur", "invert"]},
+       ])
+       frames = pipeline.process(img)      # {'source': img, 'thumb': ..., }
+
+    The duration of every stage is recorded in the metrics attribute,
+    see :py:meth:`.latency`.
+    """
+    def __init__(self, stages, workers=4):
+        self.stages = list(stages)
+        self.metrics = ActorMetrics()
+        self._children = dict((stage.name, []) for stage in self.stages)
+        if SOURCE in self._children or len(self._children) != len(self.stages):
+            raise ValueError("Stage names must be unique and not '{0}'".format(SOURCE))
+        self._roots = []
+        for stage in self.stages:
+            parents = [name for name in stage.inputs if name != SOURCE]
+            for name in parents:
+                if name not in self._children:
+                    raise ValueError("Stage {0} has an unknown input: {1}".format(stage.name, name))
+                self._children[name].append(stage)
+            if not parents:
+                self._roots.append(stage)
+        self._check_cycles()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    @classmethod
+    def from_config(cls, config, workers=4, ops=None):
+        """
+        Create a pipeline from a list of stage configurations. Every
+        configuration is a dictionary with a 'name', an 'op' from
+        :py:data:`OPS` (or ops), optional 'inputs' and 'params'.
+
+        :param list config: The stage configurations
+        :param int workers: Number of worker threads
+        :param dict ops: Operations to use instead of :py:data:`OPS`
+        """
+        ops = OPS if ops is None else ops
+        stages = []
+        for conf in config:
+            op = conf["op"]
+            func = ops[op] if isinstance(op, str) else op
+            stages.append(Stage(conf["name"], func, conf.get("inputs", (SOURCE,)),
+                                **conf.get("params", {})))
+        return cls(stages, workers)
+
+    def _check_cycles(self):
+        # run the stages in topological order, stages in a cycle never run
+        waiting = dict((stage.name, len([name for name in stage.inputs if name != SOURCE]))
+                       for stage in self.stages)
+        todo = list(self._roots)
+        ran = 0
+        while todo:
+            stage = todo.pop()
+            ran += 1
+            for child in self._children[stage.name]:
+                waiting[child.name] -= 1
+                if not waiting[child.name]:
+                    todo.append(child)
+        if ran != len(self.stages):
+            raise ValueError("The pipeline has a cycle")
+
+    def process(self, frame):
+        """
+        Run all stages on the frame. Returns a dictionary of the output
+        frame of every stage by name.
+
+        :param frame: The input frame, i.e. a numpy array
+
+        If a stage raises an exception the stages depending on it are
+        skipped and the exception is raised once the other stages are
+        done.
+        """
+        outputs = {SOURCE: frame}
+        if not self.stages:
+            return outputs
+        waiting = dict((stage.name, len([name for name in stage.inputs if name != SOURCE]))
+                       for stage in self.stages)
+        remaining = [len(self.stages)]
+        skipped = set()
+        errors = []
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def submit(stage):
+            args = [outputs[name] for name in stage.inputs]
+            try:
+                future = self._executor.submit(self._run, stage, args)
+            except Exception as e:
+                # i.e. the pipeline was closed
+                failed(stage, e)
+                return
+            future.add_done_callback(lambda future: finished(stage, future))
+
+        def failed(stage, error):
+            # the stages depending on the failed stage never run, the
+            # others finish before process returns
+            with lock:
+                errors.append(error)
+                remaining[0] -= 1
+                todo = list(self._children[stage.name])
+                while todo:
+                    child = todo.pop()
+                    if child.name not in skipped:
+                        skipped.add(child.name)
+                        remaining[0] -= 1
+                        todo.extend(self._children[child.name])
+                if not remaining[0]:
+                    done.set()
+
+        def finished(stage, future):
+            try:
+                result = future.result()
+            except Exception as e:
+                failed(stage, e)
+                return
+            ready = []
+            with lock:
+                outputs[stage.name] = result
+                remaining[0] -= 1
+                for child in self._children[stage.name]:
+                    waiting[child.name] -= 1
+                    if not waiting[child.name]:
+                        ready.append(child)
+                if not remaining[0]:
+                    done.set()
+            for child in ready:
+                submit(child)
+
+        for stage in self._roots:
+            submit(stage)
+        done.wait()
+        if errors:
+            raise errors[0]
+        return outputs
+
+    def _run(self, stage, args):
+        t = time.perf_counter()
+        result = stage.func(*args, **stage.params)
+        self.metrics.record(stage.name, time.perf_counter() - t)
+        return result
+
+    def latency(self):
+        """
+        Returns the latency statistics of every stage by name
+        """
+        return self.metrics.to_dict()["histograms"]
+
+    def close(self):
+        """
+        Stop the worker threads
+        """
+        self._executor.shutdown(wait=False)
+
+
+class PipelineActor(ReactiveActor):
+    """
+    The PipelineActor class runs a :py:class:`Pipeline` on every frame it
+    receives.
+
+    :param list pipeline: The configuration of the pipeline, see :py:meth:`Pipeline.from_config`
+    :param outputs: Names of the stages to emit
+    :param int workers: Number of worker threads of the pipeline
+
+    The frame handle is received on 'img_in'. The frame of every stage
+    in outputs is stored in :py:data:`sphof.shared_ns`, with the
+    :py:class:`sphof.frames.FrameMeta` of the received frame, and its
+    handle is emitted on the emitter with the name of the stage:
+
+    .. code-block:: python
+
+       class Filters(PipelineActor):
+           pipeline = [
+               {"name": "thumb", "op": "resize", "params": {"width": 120, "height": 90}},
+               {"name": "blur", "op": "blur", "inputs": ["thumb"]},
+           ]
+           outputs = ("thumb", "blur")
+
+    Growing the pipeline is a matter of changing the configuration.
+    """
+    pipeline = ()
+    outputs = ()
+    workers = 4
+
+    def __init__(self, *args, **kwargs):
+        self.pipe = Pipeline.from_config(self.pipeline, self.workers)
+        super(PipelineActor, self).__init__(*args, **kwargs)
+
+    def setup(self):
+        self.register_int("img_in", 0, "rs")
+        for name in self.outputs:
+            self.register_int(name, 0, "re")
+
+    def on_peer_signaled(self, peer, name, data):
+        meta = sphof.shared_ns.info(data[1])
+        img = sphof.shared_ns.pop(data[1], None)
+        if img is None:
+            return
+        frames = self.pipe.process(img)
+        if meta is not None:
+            meta = meta.hop(self.name())
+        for name in self.outputs:
+            refs = max(len(self._local_subscribers.get(name, ())), 1)
+            self.emit_signal(name, sphof.shared_ns.put(frames[name], refs, meta=meta))
+
+    def report_metrics(self):
+        super(PipelineActor, self).report_metrics()
+        for name, latency in sorted(self.pipe.latency().items()):
+            print("{0}: {1} mean {2:.2f}ms p99 {3:.2f}ms".format(
+                self.name(), name, latency["mean"] * 1000, latency["p99"] * 1000))
+
+    def stop(self):
+        self.pipe.close()
+        super(PipelineActor, self).stop()
@@ -0,0 +1,278 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import uuid
+import heapq
+import logging
+import itertools
+import threading
+from collections import deque
+from .actors import LoneActor, _run_frame, _report_metrics
+from .local_bus import local_bus, LocalInbox
+
+logger = logging.getLogger(__name__)
+
+"""
+Actor pool (:mod:`pool`)
+========================
+
+.. currentmodule:: pool
+.. autosummary::
+   :toctree:
+
+   ActorPool
+   PooledActor
+"""
+
+# states of a pooled actor
+_IDLE = 0       # waiting for its deadline in the heap
+_READY = 1      # waiting for a worker
+_RUNNING = 2    # running on a worker
+
+
+class PooledActor(LoneActor):
+    """
+    A PooledActor class is a lightweight actor without its own thread and
+    ZOCP node. It is run by an :py:class:`ActorPool`, usually the pool of
+    a :py:class:`sphof.LeadActor`:
+
+    .. code-block:: python
+
+       class Waiter(LeadActor):
+
+           def setup(self):
+               for i in range(500):
+                   self.add_actor(MyPhilosopher("Philosopher{0}".format(i)))
+
+    It has the same methods as an Actor: setup, update, draw, the
+    on_peer methods and the register, get_value, emit_signal and
+    signal_subscribe methods of ZOCP. As it doesn't have a ZOCP node it
+    can only exchange signals with actors in the same process, through
+    the :py:class:`sphof.local_bus.LocalBus`.
+
+    .. warning::
+        The update and draw methods must not block, they share the
+        worker threads with the other actors in the pool.
+    """
+    _pool = None
+
+    def __init__(self, name, *args, **kwargs):
+        self._uuid = uuid.uuid4()
+        self.capability = {}
+        self._local_subscribers = {}
+        self._local_peer = (self._uuid, name)
+        self._local_inbox = LocalInbox(notify=self._wake)
+        self._state = _IDLE
+        self._woken = False
+        self._gen = 0                           # invalidates heap entries
+        self._report_at = time.monotonic() + self.metrics_interval
+        local_bus.register(self)
+        super(PooledActor, self).__init__(name, *args, **kwargs)
+
+    def uuid(self):
+        return self._uuid
+
+    # the capability API of ZOCP, without a node the capabilities only
+    # live in the capability dictionary
+    def register_int(self, name, value, access='r', *args, **kwargs):
+        self._register(name, value, 'int', access)
+
+    def register_float(self, name, value, access='r', *args, **kwargs):
+        self._register(name, value, 'flt', access)
+
+    def register_string(self, name, value, access='r', *args, **kwargs):
+        self._register(name, value, 'string', access)
+
+    def register_bool(self, name, value, access='r', *args, **kwargs):
+        self._register(name, value, 'bool', access)
+
+    def _register(self, name, value, type_hint, access):
+        self.capability[name] = {'value': value, 'typeHint': type_hint, 'access': access}
+
+    def get_value(self, name):
+        return self.capability[name]['value']
+
+    def emit_signal(self, emitter, value):
+        self.capability[emitter]['value'] = value
+        local_bus.emit(self, emitter, value)
+
+    def signal_subscribe(self, recv_peer, receiver, emit_peer, emitter):
+        if not local_bus.subscribe_peers(recv_peer, receiver, emit_peer, emitter):
+            logger.warning("{0}: can only subscribe to actors in this process".format(self.name()))
+
+    def signal_unsubscribe(self, recv_peer, receiver, emit_peer, emitter):
+        local_bus.unsubscribe_peers(recv_peer, receiver, emit_peer, emitter)
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        return
+
+    def on_peer_exit(self, peer, name, *args, **kwargs):
+        return
+
+    def on_peer_signaled(self, peer, name, data, *args, **kwargs):
+        return
+
+    def on_peer_subscribed(self, peer, name, data, *args, **kwargs):
+        return
+
+    def run(self):
+        raise RuntimeError("A PooledActor is run by an ActorPool")
+
+    def stop(self):
+        """
+        Remove the actor from its pool
+        """
+        local_bus.unregister(self)
+        self._local_inbox.close()
+        if self._pool:
+            self._pool.remove(self)
+
+    def _wake(self):
+        if self._pool:
+            self._pool.wake(self)
+
+    def _tick(self):
+        """
+        Handle the received signals and run a frame if it's due. Returns
+        the time of the next frame.
+        """
+        local_bus.dispatch(self, self._local_inbox.drain())
+        if self.scheduler.due():
+            _run_frame(self, self.scheduler.advance())
+        now = time.monotonic()
+        if self._report_at < now:
+            _report_metrics(self)
+            self._report_at = now + self.metrics_interval
+        return now + self.scheduler.timeout()
+
+
+class ActorPool(object):
+    """
+    The ActorPool class runs many :py:class:`PooledActor` instances on a
+    fixed number of worker threads.
+
+    :param int workers: Number of worker threads
+
+    Every actor has a deadline, the time its next frame is due. A worker
+    takes the actor with the earliest deadline from a heap, runs its
+    frame and puts it back with its next deadline. An actor receiving a
+    signal is run immediately. An actor never runs on two workers at the
+    same time so its methods don't need locking.
+
+    The cost of the pool depends on the work the actors do, not on the
+    number of actors.
+    """
+    def __init__(self, workers=4):
+        self._heap = []                 # [deadline, seq, gen, actor]
+        self._ready = deque()
+        self._seq = itertools.count()
+        self._actors = set()
+        self._cond = threading.Condition(threading.Lock())
+        self._running = True
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name="ActorPool-{0}".format(i))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def add(self, actor):
+        """
+        Add an actor to the pool, its first frame is run immediately
+        """
+        with self._cond:
+            actor._pool = self
+            self._actors.add(actor)
+            actor.scheduler.start()
+            actor._state = _READY
+            self._ready.append(actor)
+            self._cond.notify()
+        logger.debug("{0} added to pool".format(actor.name()))
+
+    def remove(self, actor):
+        """
+        Remove an actor from the pool
+        """
+        with self._cond:
+            self._actors.discard(actor)
+            if actor._state == _READY:
+                self._ready.remove(actor)
+                actor._state = _IDLE
+            actor._gen += 1
+            actor._pool = None
+
+    def wake(self, actor):
+        """
+        Run the actor as soon as possible, i.e. when it received a signal
+        """
+        with self._cond:
+            actor._woken = True
+            if actor._state == _IDLE and actor in self._actors:
+                actor._gen += 1
+                actor._state = _READY
+                self._ready.append(actor)
+                self._cond.notify()
+
+    def stop(self):
+        """
+        Stop the workers
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(1.0)
+
+    def __len__(self):
+        return len(self._actors)
+
+    def _next(self):
+        # returns the next actor to run, called with the lock held
+        while self._running:
+            while self._ready:
+                actor = self._ready.popleft()
+                if actor in self._actors:
+                    return actor
+            timeout = None
+            while self._heap:
+                deadline, seq, gen, actor = self._heap[0]
+                if gen != actor._gen or actor not in self._actors:
+                    heapq.heappop(self._heap)          # stale entry
+                    continue
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    heapq.heappop(self._heap)
+                    return actor
+                break
+            self._cond.wait(timeout)
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                actor = self._next()
+                if actor is None:
+                    return
+                actor._state = _RUNNING
+                actor._woken = False
+            try:
+                deadline = actor._tick()
+            except Exception:
+                # like an Actor's thread the actor dies
+                logger.exception("Actor {0} finished.".format(actor.name()))
+                actor.stop()
+                continue
+            with self._cond:
+                if actor not in self._actors:
+                    continue
+                if actor._woken:
+                    actor._state = _READY
+                    self._ready.append(actor)
+                else:
+                    actor._state = _IDLE
+                    earliest = self._heap[0][0] if self._heap else None
+                    heapq.heappush(self._heap, [deadline, next(self._seq), actor._gen, actor])
+                    if earliest is None or deadline < earliest:
+                        # a waiting worker might sleep past this deadline
+                        self._cond.notify()
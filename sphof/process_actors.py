@@ -0,0 +1,177 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import multiprocessing
+from zocp import ZOCP
+from .actors import Actor
+from .schedulers import make_scheduler
+from .metrics import ActorMetrics
+from .canvas_actors import Painter
+from .shared_frames import SharedFrameRing
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import ImageFont
+except:
+    logger.warn("No PIL installed")
+    pass
+
+"""
+Process Actors (:mod:`process_actors`)
+======================================
+
+.. currentmodule:: process_actors
+.. autosummary::
+   :toctree:
+
+   ProcessActor
+   ProcessPainterActor
+"""
+
+
+class ProcessActor(Actor):
+    """
+    A ProcessActor class runs inside its own process instead of a
+    thread. It has the same methods as the :py:class:`sphof.Actor` class
+    and is started by a LeadActor the same way.
+
+    :param str name: Name of the node, if not given a random name will be created
+
+    As the actor runs in a separate process it does not share the
+    Python interpreter with the LeadActor. CPU heavy update and draw
+    methods therefore run in parallel with other actors. It also means
+    the actor cannot share Python objects with other actors. Images are
+    passed using the :py:class:`ProcessPainterActor`.
+
+    The object returned to the LeadActor is only a handle to the process.
+    The setup, update and draw methods are called in the process.
+
+    .. warning::
+        The process is started using the 'spawn' method. Your script
+        must create its actors inside a ``if __name__ == '__main__':``
+        block.
+    """
+    start_method = "spawn"
+
+    def __init__(self, *args, **kwargs):
+        # Actor.__init__ is not called, it creates the ZOCP node and
+        # starts the loop thread in this process. _bootstrap does that
+        # in the new process instead.
+        self._args = args
+        self._kwargs = kwargs
+        self._name = kwargs.get("name", args[0] if args else None)
+        self._in_process = False
+        self.scheduler = make_scheduler(self.fps, self.frame_policy)
+        ctx = multiprocessing.get_context(self.start_method)
+        self._stop_event = ctx.Event()
+        process = ctx.Process(target=self._bootstrap, name=self._name)
+        process.daemon = True
+        process.start()
+        self.process = process
+        print(self._name, "started in process", process.pid)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("process", None)
+        return state
+
+    def _bootstrap(self):
+        """
+        Runs in the new process, creates the ZOCP node and runs the loop
+        """
+        self._in_process = True
+        self.metrics = ActorMetrics()
+        ZOCP.__init__(self, *self._args, **self._kwargs)
+        self.process_setup()
+        self.setup()
+        ZOCP.start(self)
+        watcher = threading.Thread(target=self._watch_stop_event)
+        watcher.daemon = True
+        watcher.start()
+        self.run()
+
+    def _watch_stop_event(self):
+        self._stop_event.wait()
+        self._running = False
+
+    def process_setup(self):
+        """
+        Called in the new process before setup, after the ZOCP node is
+        created
+        """
+        return
+
+    def name(self):
+        if self._in_process:
+            return ZOCP.name(self)
+        return self._name
+
+    def stop(self):
+        """
+        Stop the actor. When called from the LeadActor this signals the
+        process to stop and waits for it.
+        """
+        if self._in_process:
+            ZOCP.stop(self)
+            return
+        self._stop_event.set()
+        self.process.join(1.0)
+        if self.process.is_alive():
+            logger.warning("Actor {0} didn't stop, terminating".format(self._name))
+            self.process.terminate()
+
+
+class ProcessPainterActor(Painter, ProcessActor):
+    """
+    The ProcessPainterActor class is a :py:class:`sphof.PainterActor` running
+    in its own process. The image is passed to the LeadActor through
+    shared memory using a :py:class:`sphof.shared_frames.SharedFrameRing`.
+
+    The 'imgID' emitter is a string containing the handle of the frame
+    in the ring. A :py:class:`sphof.CanvasActor` handles these in its
+    :py:meth:`sphof.CanvasActor.get_img_from_id` method so it's a drop-in
+    replacement of the PainterActor.
+
+    :param int ring_slots: Number of frames in the ring
+
+    A frame in the ring is overwritten after ring_slots more frames are
+    sent.
+    """
+    ring_slots = 4
+
+    def __getstate__(self):
+        # PIL drawing objects can't be pickled, they are recreated in
+        # the process
+        state = super(ProcessPainterActor, self).__getstate__()
+        for key in ("_img", "_d", "_font"):
+            state.pop(key, None)
+        return state
+
+    def process_setup(self):
+        self._ring = None
+        self._img = self._d = None
+        self._font = ImageFont.load_default()
+        self.reset()
+        self.register_string("imgID", "", 're')
+
+    def send_img(self):
+        """
+        Sends the image as a signal to any subscribers using the 'imgID'
+        emitter. The canvas is reset after the image is sent!
+        """
+        slot_size = self.width * self.height * len(self._img.getbands())
+        if self._ring is None or self._ring.slot_size < slot_size:
+            if self._ring:
+                self._ring.close()
+            self._ring = SharedFrameRing(slot_size, self.ring_slots)
+        imgID = self._ring.write(self._img)
+        self.reset()
+        self.emit_signal("imgID", imgID)
+
+    def stop(self):
+        if self._in_process and self._ring:
+            self._ring.close()
+            self._ring = None
+        super(ProcessPainterActor, self).stop()
@@ -0,0 +1,131 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+"""
+Frame schedulers (:mod:`schedulers`)
+====================================
+
+.. currentmodule:: schedulers
+.. autosummary::
+   :toctree:
+
+   FrameScheduler
+   UnthrottledScheduler
+"""
+
+SKIP = "skip"
+CATCHUP = "catchup"
+
+
+class FrameScheduler(object):
+    """
+    The FrameScheduler class determines when the next frame of an actor
+    is due.
+
+    :param float fps: The target number of frames per second
+    :param str policy: What to do when frames are missed, 'skip' or 'catchup'
+    :param int max_catchup: Maximum number of updates to run at once when catching up
+
+    Deadlines are on a fixed grid of 1/fps seconds from the start, using
+    a monotonic clock, so the time spent in a frame does not make the
+    actor drift.
+
+    When the actor can't keep up the 'skip' policy drops the missed
+    frames and continues on the next deadline. The 'catchup' policy
+    runs the update method for every missed frame (up to max_catchup)
+    before drawing once.
+    """
+    def __init__(self, fps=60., policy=SKIP, max_catchup=4):
+        if policy not in (SKIP, CATCHUP):
+            raise ValueError("Unknown frame policy: {0}".format(policy))
+        self.fps = fps
+        self.period = 1. / fps
+        self.policy = policy
+        self.max_catchup = max_catchup
+        self.deadline = None
+        self.frames = 0                 # frames run
+        self.missed = 0                 # frames skipped
+
+    def start(self):
+        """
+        Start scheduling, the first frame is due immediately
+        """
+        self.deadline = time.monotonic()
+
+    def timeout(self):
+        """
+        Returns the seconds until the next frame is due, 0 if it is due
+        """
+        return max(self.deadline - time.monotonic(), 0)
+
+    def due(self):
+        """
+        Returns True if the next frame is due
+        """
+        return time.monotonic() >= self.deadline
+
+    def advance(self):
+        """
+        Move to the next deadline. Returns the number of updates to run
+        for this frame.
+        """
+        behind = int((time.monotonic() - self.deadline) // self.period)
+        if behind > 0 and self.policy == CATCHUP:
+            updates = min(behind + 1, self.max_catchup)
+        else:
+            updates = 1
+        if behind + 1 > updates:
+            self.missed += behind + 1 - updates
+            logger.debug("Missed {0} frames".format(behind + 1 - updates))
+        self.deadline += (behind + 1) * self.period
+        self.frames += 1
+        return updates
+
+
+class UnthrottledScheduler(FrameScheduler):
+    """
+    The UnthrottledScheduler runs frames as fast as possible. Use it for
+    benchmarks or offline rendering.
+    """
+    def __init__(self):
+        self.fps = 0
+        self.period = 0
+        self.policy = SKIP
+        self.deadline = None
+        self.frames = 0
+        self.missed = 0
+
+    def start(self):
+        self.deadline = time.monotonic()
+
+    def timeout(self):
+        return 0
+
+    def due(self):
+        return True
+
+    def advance(self):
+        self.frames += 1
+        return 1
+
+
+def make_scheduler(fps=60., policy=SKIP, previous=None):
+    """
+    Returns a scheduler for the given fps. A fps of 0 or None returns
+    an :py:class:`UnthrottledScheduler`.
+
+    :param previous: The scheduler it replaces. If that one was started the new one is started and keeps its counters.
+    """
+    if not fps:
+        scheduler = UnthrottledScheduler()
+    else:
+        scheduler = FrameScheduler(fps, policy)
+    if previous is not None and previous.deadline is not None:
+        scheduler.start()
+        scheduler.frames = previous.frames
+        scheduler.missed = previous.missed
+    return scheduler
@@ -0,0 +1,254 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import struct
+import logging
+import itertools
+import threading
+from multiprocessing import shared_memory, resource_tracker
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+"""
+Shared memory frames (:mod:`shared_frames`)
+===========================================
+
+.. currentmodule:: shared_frames
+.. autosummary::
+   :toctree:
+
+   SharedFrameRing
+   read_frame
+"""
+
+# ring header: slots, slot size, closed
+_RING = struct.Struct("QQQ")
+# per slot header: sequence, nbytes, width, height, mode
+_HEADER = struct.Struct("QQII8s")
+
+
+class SharedFrameRing(object):
+    """
+    The SharedFrameRing class provides a ring of frame slots in a
+    shared memory segment. It is used to pass images between Actors
+    running in different processes without pickling them.
+
+    :param int slot_size: Size of a slot in bytes, i.e. width * height * 3
+    :param int slots: Number of slots in the ring
+    :param str name: Name of an existing segment to attach to, if not given a new segment is created
+
+    When attaching to an existing segment the slot_size and slots are read
+    from the segment.
+
+    The producer writes a frame into the next slot with :py:meth:`.write`
+    which returns a handle string ('segment:slot:sequence'). This handle
+    can be emitted as a signal. Any process can read the frame using
+    :py:func:`read_frame`.
+
+    A frame is valid until the ring wraps around, after that
+    :py:func:`read_frame` returns None for its handle. When the producer
+    closes the ring the readers detach from the segment on their next
+    :py:func:`read_frame`.
+    """
+    def __init__(self, slot_size=None, slots=4, name=None):
+        self.owner = name is None
+        if self.owner:
+            size = _RING.size + (_HEADER.size + slot_size) * slots
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            _created.add(self._shm.name)
+            _RING.pack_into(self._shm.buf, 0, slots, slot_size, 0)
+        else:
+            self._shm = _open_segment(name)
+            slots, slot_size, closed = _RING.unpack_from(self._shm.buf, 0)
+        self.slots = slots
+        self.slot_size = slot_size
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        self._slot = itertools.cycle(range(slots))
+        self._seq = itertools.count(1)
+
+    def write(self, frame):
+        """
+        Write a frame into the next slot and return its handle
+
+        :param frame: A PIL image or a numpy array
+        """
+        if hasattr(frame, "tobytes") and hasattr(frame, "getbands"):
+            width, height = frame.size
+            mode = frame.mode
+            data = frame.tobytes()
+        else:
+            height, width = frame.shape[:2]
+            mode = "RGB" if frame.ndim == 3 and frame.shape[2] == 3 else "L"
+            data = memoryview(frame).cast("B")
+        nbytes = len(data)
+        if nbytes > self.slot_size:
+            raise ValueError("Frame of {0} bytes does not fit slot of {1} bytes".format(nbytes, self.slot_size))
+        slot = next(self._slot)
+        seq = next(self._seq)
+        header = self._header_offset(slot)
+        offset = self._data_offset(slot)
+        # mark the slot as being written
+        _HEADER.pack_into(self._buf, header, 0, 0, 0, 0, b"")
+        self._buf[offset:offset + nbytes] = data
+        _HEADER.pack_into(self._buf, header, seq, nbytes, width, height, mode.encode())
+        return "{0}:{1}:{2}".format(self.name, slot, seq)
+
+    def view(self, slot, seq):
+        """
+        Returns a (mode, size, memoryview) tuple of the given slot or None
+        if the slot does not contain the frame with the given sequence
+        anymore.
+
+        :param int slot: The slot of the frame
+        :param int seq: The sequence number of the frame
+        """
+        cur, nbytes, width, height, mode = _HEADER.unpack_from(self._buf, self._header_offset(slot))
+        if cur != seq:
+            return None
+        offset = self._data_offset(slot)
+        return mode.rstrip(b"\0").decode(), (width, height), self._buf[offset:offset + nbytes]
+
+    def sequence(self, slot):
+        """
+        Returns the sequence number of the frame in the given slot
+        """
+        return _HEADER.unpack_from(self._buf, self._header_offset(slot))[0]
+
+    def closed(self):
+        """
+        Returns True if the producer closed the ring
+        """
+        return self._buf is None or bool(_RING.unpack_from(self._buf, 0)[2])
+
+    def close(self):
+        """
+        Close the ring, the segment is removed if we created it
+        """
+        if self._buf is None:
+            return
+        if self.owner:
+            # tell the readers to detach
+            _RING.pack_into(self._buf, 0, self.slots, self.slot_size, 1)
+        self._buf = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # images read without copying still use the segment, it is
+            # unmapped once they are gone
+            logger.debug("Shared frame segment {0} is still in use".format(self.name))
+        if self.owner:
+            self._shm.unlink()
+            _created.discard(self.name)
+
+    def _header_offset(self, slot):
+        return _RING.size + _HEADER.size * slot
+
+    def _data_offset(self, slot):
+        return _RING.size + _HEADER.size * self.slots + self.slot_size * slot
+
+
+def _open_segment(name):
+    """
+    Attach to an existing segment without registering it with the
+    resource tracker, we don't own it so it must not be unlinked when we
+    exit
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # python < 3.13 always registers the segment. The tracker keeps
+        # one registration per segment, if the segment was created in
+        # this process it is the producer's.
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix" and shm.name not in _created:
+            resource_tracker.unregister("/" + shm.name, "shared_memory")
+        return shm
+
+
+_created = set()    # names of the segments created in this process
+
+
+# A producer creates a new segment, with a new name, whenever it
+# replaces its ring so the name identifies the generation of the ring.
+_rings = {}     # segment name : SharedFrameRing, rings attached by readers
+_rings_lock = threading.Lock()
+
+
+def _attach(name):
+    with _rings_lock:
+        ring = _rings.get(name)
+        if ring is None:
+            # detach from the rings closed by their producers
+            for stale in [key for key, other in _rings.items() if other.closed()]:
+                _rings.pop(stale).close()
+            ring = SharedFrameRing(name=name)
+            _rings[name] = ring
+        return ring
+
+
+def _detach(name, ring):
+    with _rings_lock:
+        if _rings.get(name) is ring:
+            del _rings[name]
+            ring.close()
+
+
+def is_shared_handle(handle):
+    """
+    Returns True if the handle refers to a frame in a SharedFrameRing
+    """
+    return isinstance(handle, str) and handle.count(":") == 2
+
+
+def read_frame(handle, copy=True):
+    """
+    Read the frame of the given handle as a PIL image. Returns None if
+    the frame has been overwritten.
+
+    :param str handle: A handle returned by :py:meth:`SharedFrameRing.write`
+    :param bool copy: Copy the pixels out of the ring
+
+    With copy set to False frames in the 'L', 'P', 'RGBA', 'RGBX' and
+    'CMYK' modes are returned as a view of the slot. The producer
+    overwrites the view when the ring wraps around, so only use it
+    until the next ring_slots frames are written.
+    """
+    name, slot, seq = handle.split(":")
+    slot, seq = int(slot), int(seq)
+    try:
+        ring = _attach(name)
+    except FileNotFoundError:
+        logger.debug("Shared frame segment {0} is gone".format(name))
+        return None
+    if ring.closed():
+        _detach(name, ring)
+        return None
+    view = ring.view(slot, seq)
+    if view is None:
+        return None
+    mode, size, data = view
+    img = Image.frombuffer(mode, size, data, "raw", mode, 0, 1)
+    if mode in ("L", "P", "RGBA", "RGBX", "CMYK"):
+        if not copy:
+            return img
+        img = img.copy()
+    # the frame was copied, check it wasn't overwritten meanwhile
+    if ring.sequence(slot) != seq:
+        return None
+    return img
+
+
+def close_all():
+    """
+    Detach all rings attached by :py:func:`read_frame`
+    """
+    with _rings_lock:
+        for ring in _rings.values():
+            ring.close()
+        _rings.clear()
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+pytest.importorskip("zocp")
+
+from sphof.actors import LeadActor
+from sphof.aio import AsyncActor
+
+
+class Ticker(AsyncActor):
+    fps = 200
+
+    def setup(self):
+        self.frames = 0
+
+    async def update(self):
+        self.frames += 1
+
+
+class Lead(LeadActor):
+
+    def setup(self):
+        self.ticker = Ticker("Ticker")
+        self.add_actor(self.ticker)
+
+    def update(self):
+        return
+
+
+def test_plain_lead_actor_runs_async_actors():
+    lead = Lead("Lead")
+    try:
+        end = time.monotonic() + 2
+        while lead.ticker.frames < 5 and time.monotonic() < end:
+            time.sleep(0.01)
+        assert lead.ticker.frames >= 5
+    finally:
+        lead.stop()
+    lead.ticker.thread.join(2)
+    assert not lead.ticker.thread.is_alive()
@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from sphof.capture import CaptureSource, SyntheticSource, open_source
+
+
+@pytest.fixture
+def capture():
+    capture = CaptureSource(SyntheticSource(8, 4, fps=200), slots=3).start()
+    yield capture
+    capture.stop()
+
+
+def test_latest_returns_newer_frames(capture):
+    first = capture.latest(timeout=1)
+    assert first.image is not None and first.image.shape == (4, 8, 3)
+    second = capture.latest(after=first.seq, timeout=1)
+    assert second.seq > first.seq and second.timestamp >= first.timestamp
+    assert capture.latest(after=capture.seq + 1000).image is None
+
+
+def test_latest_copies_out_of_the_ring(capture):
+    frame = capture.latest(timeout=1)
+    pixels = frame.image.copy()
+    capture.latest(after=frame.seq + 5, timeout=1)
+    assert (frame.image == pixels).all()
+    out = np.zeros((4, 8, 3), np.uint8)
+    assert capture.latest(out=out, timeout=1).image is out
+
+
+def test_untaken_frames_are_dropped(capture):
+    first = capture.latest(timeout=1)
+    last = capture.latest(after=first.seq + 10, timeout=1)
+    stats = capture.stats()
+    assert stats["dropped"] >= last.seq - first.seq - 1
+    assert stats["failed"] == 0
+
+
+def test_open_source():
+    source = open_source("synthetic:16x8")
+    ok, frame = source.read()
+    assert ok and frame.shape == (8, 16, 3)
+    assert open_source(source) is source
+    with pytest.raises(ValueError):
+        CaptureSource(source, slots=1)
@@ -0,0 +1,43 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from sphof.displays import OffscreenDisplay, ArraySink
+
+
+class ClosingSink(ArraySink):
+    closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+def test_blit_copies_the_pixels():
+    display = OffscreenDisplay(4, 4, ArraySink())
+    img = Image.new("RGB", (4, 4), "red")
+    display.blit("background", img)
+    img.paste((0, 0, 255), (0, 0, 4, 4))     # the producer reuses its canvas
+    display.update()
+    assert tuple(display.sink.array[0, 0]) == (255, 0, 0)
+
+
+def test_blit_copies_the_damaged_region():
+    display = OffscreenDisplay(4, 4, ArraySink())
+    img = Image.new("RGB", (4, 4), "red")
+    display.blit("background", img)
+    img.paste((0, 0, 255), (0, 0, 2, 2))
+    display.blit("background", img, damage=(0, 0, 2, 2))
+    img.paste((0, 255, 0), (0, 0, 4, 4))
+    display.update()
+    assert tuple(display.sink.array[0, 0]) == (0, 0, 255)
+    assert tuple(display.sink.array[3, 3]) == (255, 0, 0)
+
+
+def test_canvas_actor_closes_its_display():
+    pytest.importorskip("zocp")
+    from sphof.canvas_actors import CanvasActor
+    sink = ClosingSink()
+    actor = CanvasActor("Canvas", display=OffscreenDisplay(sink=sink))
+    actor.stop()
+    actor.stop()
+    assert sink.closed == 1
@@ -0,0 +1,109 @@
+import sys
+import threading
+from sphof.frames import FrameRegistry, FrameLink
+
+
+def test_window_refuses_frames():
+    registry = FrameRegistry()
+    link = FrameLink(registry, window=2)
+    first = link.send("a")
+    second = link.send("b")
+    assert first and second
+    assert link.credits() == 0
+    assert link.send("c") is None
+    assert link.dropped == 1
+    registry.release(first)
+    assert link.credits() == 1
+    assert link.in_flight() == 1
+
+
+def test_release_callback():
+    registry = FrameRegistry()
+    link = FrameLink(registry, window=1)
+    released = []
+    handle = link.send("a", on_release=lambda handle, obj: released.append((handle, obj)))
+    registry.pop(handle)
+    assert released == [(handle, "a")]
+    assert link.credits() == 1
+
+
+def test_latest_only_replaces_unfetched_frames():
+    registry = FrameRegistry()
+    link = FrameLink(registry, window=1, latest_only=True)
+    first = link.send("a")
+    second = link.send("b")
+    assert second is not None
+    assert first not in registry
+    assert link.dropped == 1
+    # a fetched frame is not replaced
+    registry.get(second)
+    assert link.send("c") is None
+
+
+def test_send_and_release_from_two_threads():
+    # send takes the link lock then the registry lock, release the
+    # registry lock then the link lock through the release callback
+    registry = FrameRegistry()
+    link = FrameLink(registry, window=4, latest_only=True)
+    handles = []
+    stop = threading.Event()
+
+    def send():
+        while not stop.is_set():
+            handle = link.send(object())
+            if handle is not None:
+                handles.append(handle)
+
+    def release():
+        while not stop.is_set():
+            if handles:
+                registry.release(handles.pop(0))
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=send), threading.Thread(target=release)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        stop.wait(0.5)
+        stop.set()
+        for thread in threads:
+            thread.join(5)
+        assert not any(thread.is_alive() for thread in threads)
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_evicted_frames_use_on_evict():
+    registry = FrameRegistry(ttl=0)
+    link = FrameLink(registry, window=2)
+    released, evicted = [], []
+    handle = link.send("a", on_release=lambda h, obj: released.append(h),
+                       on_evict=lambda h, obj: evicted.append(h))
+    registry.evict()
+    assert evicted == [handle] and released == []
+    assert link.credits() == 2
+
+
+def test_callbacks_run_without_the_link_lock():
+    registry = FrameRegistry(max_frames=1)
+    first = FrameLink(registry)
+    second = FrameLink(registry)
+    held = []
+
+    def on_evict(handle, obj):
+        # the eviction is caused by second.send, its lock must be free
+        def try_lock():
+            if second._lock.acquire(timeout=0.5):
+                second._lock.release()
+                held.append(False)
+            else:
+                held.append(True)
+        t = threading.Thread(target=try_lock)
+        t.start()
+        t.join()
+
+    first.send("a", on_evict=on_evict)
+    second.send("b")
+    assert held == [False]
@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+
+from sphof.frames import FrameRegistry, FrameMeta
+
+
+def test_frame_is_removed_when_all_refs_are_released():
+    registry = FrameRegistry()
+    released = []
+    handle = registry.put("frame", refs=2, on_release=lambda h, obj: released.append(obj))
+    assert registry.get(handle) == "frame"
+    assert registry.pop(handle) == "frame"
+    assert handle in registry and not released
+    assert registry.release(handle)
+    assert handle not in registry and released == ["frame"]
+    assert not registry.release(handle)
+    assert registry.pop(handle, None) is None
+    with pytest.raises(KeyError):
+        registry.pop(handle)
+
+
+def test_acquire_adds_refs():
+    registry = FrameRegistry()
+    handle = registry.put("frame")
+    assert registry.acquire(handle)
+    registry.release(handle)
+    assert handle in registry
+    registry.release(handle)
+    assert not registry.acquire(handle)
+
+
+def test_handles_are_never_reused():
+    registry = FrameRegistry()
+    first = registry.put("a")
+    registry.release(first)
+    assert registry.put("b") != first
+
+
+def test_expired_frames_are_evicted():
+    registry = FrameRegistry(ttl=10)
+    handle = registry.put("old")
+    registry._entries[handle].expires = 0
+    fresh = registry.put("new")
+    assert handle not in registry and fresh in registry
+    assert registry.evicted == 1
+
+
+def test_least_recently_used_frames_are_evicted():
+    registry = FrameRegistry(max_frames=2)
+    a = registry.put("a")
+    b = registry.put("b")
+    registry.get(a)                     # a is used more recently than b
+    c = registry.put("c")
+    assert registry.keys() == [a, c]
+    registry = FrameRegistry(max_bytes=10)
+    registry.put(bytearray(8))
+    big = registry.put(memoryview(bytearray(100)))  # the frame just stored is kept
+    assert registry.keys() == [big] and registry.nbytes() == 100
+
+
+def test_revoke_only_unfetched_frames():
+    registry = FrameRegistry()
+    a = registry.put("a")
+    b = registry.put("b")
+    registry.get(b)
+    assert registry.revoke(a) and a not in registry
+    assert not registry.revoke(b) and b in registry
+
+
+def test_derive_caches_per_frame():
+    registry = FrameRegistry()
+    handle = registry.put("frame")
+    calls = []
+
+    def upper(obj, suffix):
+        calls.append(obj)
+        return obj.upper() + suffix
+
+    assert registry.derive(handle, "upper", upper, "!") == "FRAME!"
+    assert registry.derive(handle, "upper", upper, "!") == "FRAME!"
+    assert registry.derive(handle, "upper", upper, "?") == "FRAME?"
+    assert len(calls) == 2 and registry.derived_hits == 1
+    registry.release(handle)
+    with pytest.raises(KeyError):
+        registry.derive(handle, "upper", upper, "!")
+
+
+def test_derive_computes_once_across_threads():
+    registry = FrameRegistry()
+    handle = registry.put("frame")
+    started = threading.Event()
+    go = threading.Event()
+    calls = []
+
+    def slow(obj):
+        calls.append(obj)
+        started.set()
+        go.wait(1)
+        return obj.upper()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.derive(handle, "upper", slow)))
+               for i in range(3)]
+    threads[0].start()
+    started.wait(1)
+    for thread in threads[1:]:
+        thread.start()
+    go.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["FRAME"] * 3 and len(calls) == 1
+
+
+def test_info_and_dictionary_interface():
+    registry = FrameRegistry()
+    meta = FrameMeta("camera", 7, origin=1.)
+    handle = registry.put("frame", meta=meta)
+    assert registry.info(handle) is meta
+    registry["key"] = "value"
+    assert registry["key"] == "value" and len(registry) == 2
+    del registry["key"]
+    assert "key" not in registry
+    registry.clear()
+    assert len(registry) == 0 and registry.nbytes() == 0
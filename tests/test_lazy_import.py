@@ -0,0 +1,23 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_sphof_does_not_load_pil_or_tkinter():
+    code = ("import sys, sphof; "
+            "print(sorted(m for m in ('PIL', 'tkinter') if m in sys.modules))")
+    out = subprocess.check_output([sys.executable, "-c", code], cwd=ROOT)
+    assert out.decode().strip() == "[]"
+
+
+def test_lazy_names_resolve():
+    pytest.importorskip("PIL")
+    pytest.importorskip("zocp")
+    import sphof
+    from sphof.canvas_actors import PainterActor
+    assert sphof.PainterActor is PainterActor
+    assert "PainterActor" in dir(sphof)
@@ -0,0 +1,49 @@
+import pytest
+
+pytest.importorskip("zocp")
+
+from sphof.actors import Actor, LeadActor
+
+
+class Idle(Actor):
+
+    def setup(self):
+        self.entered = []
+
+    def update(self):
+        return
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        self.entered.append(name)
+
+
+class Lead(LeadActor):
+
+    def setup(self):
+        self.events = []
+        self.child = Idle("Child")
+        self.add_actor(self.child)
+        # registered after add_actor, on_peer_enter must see it
+        self.register_int("out", 0, "re")
+
+    def update(self):
+        return
+
+    def on_peer_enter(self, peer, name, *args, **kwargs):
+        self.events.append(("enter", name, "out" in self.capability))
+
+    def on_peer_exit(self, peer, name, *args, **kwargs):
+        self.events.append(("exit", name))
+
+
+def test_local_actors_enter_through_the_inbox():
+    lead = Lead("Lead")
+    try:
+        assert lead.events == []
+        lead.run_once(0)
+        assert lead.events == [("enter", "Child", True)]
+        lead.remove_actor(lead.child)
+        lead.run_once(0)
+        assert lead.events[1:] == [("exit", "Child")]
+    finally:
+        lead.stop()
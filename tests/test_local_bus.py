@@ -0,0 +1,110 @@
+import pytest
+
+from sphof.local_bus import LocalBus, LocalInbox, SIG
+
+
+def test_inbox_wakes_the_receiver():
+    inbox = LocalInbox()
+    inbox.put((SIG, "peer", "name", ["out", 1], "in"))
+    inbox.put((SIG, "peer", "name", ["out", 2], "in"))
+    assert len(inbox) == 2
+    assert inbox._reader.recv(16) == b"\0"
+    assert [msg[3][1] for msg in inbox.drain()] == [1, 2]
+    assert not len(inbox)
+    inbox.close_sockets()
+
+
+def test_inbox_notify():
+    woken = []
+    inbox = LocalInbox(notify=lambda: woken.append(1))
+    inbox.put(1)
+    inbox.put(2)
+    assert woken == [1]
+    assert inbox.drain() == [1, 2]
+
+
+def test_closed_inbox_closes_its_sockets():
+    inbox = LocalInbox()
+    reader, writer = inbox._reader, inbox._writer
+    inbox.close()
+    inbox.put(1)
+    assert not len(inbox)
+    inbox.close_sockets()
+    assert reader.fileno() == -1 and writer.fileno() == -1
+
+
+class Peer(object):
+    """
+    The parts of an Actor the bus uses
+    """
+    def __init__(self, name):
+        self._name = name
+        self._local_peer = (name + "-uuid", name)
+        self._local_subscribers = {}
+        self._local_inbox = LocalInbox(notify=lambda: None)
+        self.capability = {"in": {"value": None}}
+        self.signaled = []
+        self.subscribed = []
+
+    def uuid(self):
+        return self._local_peer[0]
+
+    def on_peer_signaled(self, peer, name, data):
+        self.signaled.append((name, data))
+
+    def on_peer_subscribed(self, peer, name, data):
+        self.subscribed.append((name, data))
+
+
+def test_bus_routes_signals_to_subscribers():
+    bus = LocalBus()
+    emitter, receiver, other = Peer("emitter"), Peer("receiver"), Peer("other")
+    for peer in (emitter, receiver, other):
+        bus.register(peer)
+    assert bus.get("receiver-uuid") is receiver and len(bus) == 3
+    bus.subscribe(receiver, "in", emitter, "out")
+    bus.dispatch(emitter, emitter._local_inbox.drain())
+    assert emitter.subscribed == [("receiver", ["out", "in"])]
+
+    bus.subscribe(receiver, "in", emitter, "out")     # not subscribed twice
+    bus.emit(emitter, "out", 42)
+    bus.emit(emitter, "other", 1)
+    bus.dispatch(receiver, receiver._local_inbox.drain())
+    assert receiver.signaled == [("emitter", ["out", 42])]
+    assert receiver.capability["in"]["value"] == 42
+    assert not len(other._local_inbox)
+
+    bus.unregister(receiver)
+    bus.emit(emitter, "out", 43)
+    assert not len(receiver._local_inbox)
+    assert bus.get("receiver-uuid") is None
+
+
+def test_unsubscribe():
+    bus = LocalBus()
+    emitter, receiver = Peer("emitter"), Peer("receiver")
+    bus.subscribe(receiver, "in", emitter, "out")
+    bus.unsubscribe(receiver, "in", emitter, "out")
+    bus.emit(emitter, "out", 1)
+    assert not len(receiver._local_inbox)
+
+
+def test_stopped_actor_closes_its_inbox():
+    pytest.importorskip("zocp")
+    from sphof.actors import Actor
+
+    class Idle(Actor):
+        fps = 100
+
+        def setup(self):
+            return
+
+        def update(self):
+            return
+
+    actor = Idle("Idle")
+    inbox = actor._local_inbox
+    actor.stop()
+    actor._running = False
+    actor.thread.join(2)
+    assert inbox._reader.fileno() == -1 and inbox._writer.fileno() == -1
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from sphof.frames import FrameMeta
+from sphof.metrics import Histogram, ActorMetrics, LatencyTracker
+
+
+def test_percentiles_are_within_a_bucket():
+    hist = Histogram()
+    for i in range(1, 101):
+        hist.record(i / 1000.)
+    assert hist.count == 100
+    assert hist.mean() == pytest.approx(0.0505)
+    assert hist.min == 0.001 and hist.max == 0.1
+    assert hist.percentile(50) == pytest.approx(0.050, rel=0.1)
+    assert hist.percentile(90) == pytest.approx(0.090, rel=0.1)
+    assert hist.percentile(100) == 0.1
+
+
+def test_record_from_threads():
+    hist = Histogram()
+
+    def record():
+        for i in range(10000):
+            hist.record(0.001)
+
+    threads = [threading.Thread(target=record) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hist.count == 40000 and sum(hist.buckets) == 40000
+
+
+def test_summary_fps_is_per_interval(monkeypatch):
+    now = [100.]
+    monkeypatch.setattr("sphof.metrics.time.monotonic", lambda: now[0])
+    metrics = ActorMetrics()
+    for i in range(600):
+        metrics.record("frame", 0.001)
+    now[0] += 10
+    assert metrics.summary().startswith("fps: 60.0 ")
+    for i in range(100):
+        metrics.record("frame", 0.001)
+    now[0] += 10
+    assert metrics.summary().startswith("fps: 10.0 ")
+
+
+def test_metrics_to_dict():
+    metrics = ActorMetrics()
+    with metrics.timer("blur"):
+        pass
+    metrics.count("sent", 2)
+    metrics.gauge("in_flight", 3)
+    result = metrics.to_dict()
+    assert result["histograms"]["blur"]["count"] == 1
+    assert result["counters"] == {"sent": 2}
+    assert result["gauges"] == {"in_flight": 3}
+
+
+def test_latency_per_hop():
+    tracker = LatencyTracker()
+    meta = FrameMeta("camera", 1, origin=10.).hop("blur", 10.002).hop("send", 10.003)
+    tracker.record(meta, "display", 10.013)
+    assert tracker.sources() == ["camera"]
+    assert tracker.slowest("camera") == ("display", pytest.approx(0.010, rel=0.1))
+    stats = tracker.to_dict()["camera"]
+    assert stats["total"]["max"] == pytest.approx(0.013)
+    assert [name for name, hop in stats["hops"]] == ["blur", "send", "display"]
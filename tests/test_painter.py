@@ -0,0 +1,137 @@
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("zocp")
+
+from sphof.canvas_actors import Painter
+
+
+def pixel(painter, x, y):
+    return painter._img.getpixel((x, y))
+
+
+def test_reset_clears_what_was_drawn():
+    painter = Painter()
+    painter.rectangle([10, 10, 20, 20], fill=(255, 0, 0))
+    assert pixel(painter, 15, 15) == (255, 0, 0)
+    assert painter.get_damage() is not None
+    painter.reset()
+    assert pixel(painter, 15, 15) == painter.background_color
+
+
+def test_invalidate_clears_direct_writes():
+    painter = Painter()
+    painter._img.putpixel((100, 300), (0, 255, 0))
+    painter.invalidate((100, 300, 101, 301))
+    painter._img.putpixel((5, 5), (0, 255, 0))
+    painter.invalidate()
+    painter.reset()
+    assert pixel(painter, 100, 300) == painter.background_color
+    assert pixel(painter, 5, 5) == painter.background_color
+
+
+def test_damage_includes_a_positional_width():
+    painter = Painter()
+    painter.take_damage()
+    painter.rectangle([50, 50, 60, 60], None, (255, 0, 0), 10)
+    x0, y0, x1, y1 = painter.take_damage()
+    assert x0 <= 45 and y0 <= 45 and x1 >= 65 and y1 >= 65
+    painter.ellipse([50, 50, 60, 60], None, (255, 0, 0), 10)
+    x0, y0, x1, y1 = painter.take_damage()
+    assert x0 <= 45 and x1 >= 65
+
+
+def test_numpy_painter_draws_into_the_array():
+    pytest.importorskip("numpy")
+    from sphof.canvas_actors import NumpyPainter
+    painter = NumpyPainter()
+    painter.rectangle([10, 10, 20, 20], fill=(255, 0, 0))
+    assert tuple(painter._img.info["array"][15, 15, :3]) == (255, 0, 0)
+
+
+def test_painter_actor_sends_in_its_first_update():
+    import threading
+    from sphof.canvas_actors import PainterActor
+
+    class FirstFrame(PainterActor):
+
+        def setup(self):
+            self.sent = threading.Event()
+
+        def update(self):
+            if not self.sent.is_set() and self.send_img():
+                self.sent.set()
+
+    actor = FirstFrame("FirstFrame")
+    try:
+        assert actor.sent.wait(5)
+        assert actor.thread.is_alive()
+    finally:
+        actor.stop()
+
+
+def test_points_set_pixels_and_damage():
+    np = pytest.importorskip("numpy")
+    painter = Painter()
+    painter.take_damage()
+    painter.points(np.array([[5, 6], [30, 40]]), (255, 0, 0))
+    assert pixel(painter, 5, 6) == (255, 0, 0)
+    assert pixel(painter, 30, 40) == (255, 0, 0)
+    assert pixel(painter, 6, 6) == painter.background_color
+    assert painter.take_damage() == (5, 6, 31, 41)
+
+
+def test_points_with_a_color_per_point():
+    np = pytest.importorskip("numpy")
+    painter = Painter()
+    painter.points([[1, 1], [2, 2]], np.array([[255, 0, 0], [0, 0, 255]]))
+    assert pixel(painter, 1, 1) == (255, 0, 0)
+    assert pixel(painter, 2, 2) == (0, 0, 255)
+
+
+def test_lines_draw_thin_and_wide_segments():
+    pytest.importorskip("numpy")
+    painter = Painter()
+    painter.take_damage()
+    painter.lines([[10, 20, 50, 20], [10, 100, 10, 140]], (0, 255, 0), width=[1, 5])
+    assert pixel(painter, 10, 20) == pixel(painter, 50, 20) == (0, 255, 0)
+    assert pixel(painter, 30, 21) == painter.background_color
+    assert pixel(painter, 12, 120) == (0, 255, 0)
+    x0, y0, x1, y1 = painter.take_damage()
+    assert x0 <= 8 and y0 <= 20 and x1 >= 51 and y1 >= 140
+
+
+def test_ellipses_fill_and_damage():
+    pytest.importorskip("numpy")
+    painter = Painter()
+    painter.take_damage()
+    painter.ellipses([[10, 10, 30, 30], [100, 200, 120, 220]], fill=(0, 0, 255))
+    assert pixel(painter, 20, 20) == (0, 0, 255)
+    assert pixel(painter, 110, 210) == (0, 0, 255)
+    assert pixel(painter, 10, 10) == painter.background_color
+    x0, y0, x1, y1 = painter.take_damage()
+    assert x0 <= 10 and y0 <= 10 and x1 >= 120 and y1 >= 220
+
+
+def test_batches_are_clipped_at_the_canvas_edge():
+    pytest.importorskip("numpy")
+    painter = Painter()
+    painter.take_damage()
+    painter.points([[-1, 5], [5, -1], [200, 5], [5, 600]], (255, 0, 0))
+    assert painter.take_damage() is None
+    painter.lines([[-50, 10, 250, 10]], (255, 0, 0))
+    assert pixel(painter, 0, 10) == pixel(painter, 199, 10) == (255, 0, 0)
+    x0, y0, x1, y1 = painter.take_damage()
+    assert x0 >= 0 and x1 <= 200
+    painter.ellipses([[190, 590, 210, 610]], fill=(255, 0, 0))
+    assert pixel(painter, 199, 599) == (255, 0, 0)
+
+
+def test_empty_batches_draw_nothing():
+    pytest.importorskip("numpy")
+    painter = Painter()
+    painter.take_damage()
+    painter.points([], (255, 0, 0))
+    painter.lines([], (255, 0, 0))
+    painter.ellipses([], fill=(255, 0, 0))
+    assert painter.take_damage() is None
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from sphof.philosopher_table import PhilosopherTable
+
+
+def check_exclusion(table):
+    for seat in range(table.seats):
+        right = (seat + 1) % table.seats
+        assert not (table.eating(seat) and table.eating(right))
+        if table.eating(seat):
+            assert table.chopsticks[seat] and table.chopsticks[right]
+
+
+def simulate(table, steps, rng):
+    # every philosopher is hungry again right after its meal
+    for seat in range(table.seats):
+        table.request(seat)
+    for i in range(steps):
+        eating = [seat for seat in range(table.seats) if table.eating(seat)]
+        assert eating, "nobody eats, the table is deadlocked"
+        seat = rng.choice(eating)
+        table.release(seat)
+        table.request(seat)
+        check_exclusion(table)
+
+
+@pytest.mark.parametrize("seats", [2, 3, 5, 100])
+@pytest.mark.parametrize("policy", PhilosopherTable.policies)
+def test_neighbours_never_eat_together(seats, policy):
+    table = PhilosopherTable(seats, policy)
+    simulate(table, 2000, random.Random(seats))
+    assert table.grants == sum(table.meals)
+
+
+def test_fair_table_feeds_everybody():
+    table = PhilosopherTable(5, "fair")
+    simulate(table, 5000, random.Random(1))
+    assert min(table.meals) > 0.5 * max(table.meals)
+
+
+def test_release_grants_hungry_neighbours():
+    table = PhilosopherTable(5)
+    assert table.request(0)
+    assert not table.request(1)
+    assert table.request(0)             # still eating
+    assert table.release(0) == [1]
+    assert table.eating(1) and not table.eating(0)
+    assert table.release(0) == []
+
+
+def test_table_checks_its_arguments():
+    with pytest.raises(ValueError):
+        PhilosopherTable(1)
+    with pytest.raises(ValueError):
+        PhilosopherTable(5, "random")
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+pytest.importorskip("zocp")
+
+from sphof.pipeline import Pipeline, Stage, SOURCE
+
+
+def add(*args, **params):
+    return sum(args) + params.get("value", 0)
+
+
+def fail(*args):
+    raise ValueError("stage failed")
+
+
+def test_process_runs_the_graph():
+    pipeline = Pipeline([
+        Stage("a", add, value=1),
+        Stage("b", add, ["a"], value=10),
+        Stage("c", add, ["a"], value=100),
+        Stage("mix", add, ["b", "c"]),
+    ], workers=2)
+    try:
+        frames = pipeline.process(1)
+    finally:
+        pipeline.close()
+    assert frames == {SOURCE: 1, "a": 2, "b": 12, "c": 102, "mix": 114}
+    assert set(pipeline.latency()) == {"a", "b", "c", "mix"}
+
+
+def test_config_checks_the_graph():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", add, ["b"]), Stage("b", add, ["a"])])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", add, ["missing"])])
+
+
+def test_failed_stage_skips_its_descendants():
+    ran = []
+    slow = threading.Event()
+
+    def record(name):
+        def func(*args):
+            if name == "sibling":
+                slow.wait(1)
+            ran.append(name)
+            return 0
+        return func
+
+    pipeline = Pipeline([
+        Stage("bad", fail),
+        Stage("child", record("child"), ["bad"]),
+        Stage("grandchild", record("grandchild"), ["child", "sibling"]),
+        Stage("sibling", record("sibling")),
+    ], workers=2)
+    threading.Timer(0.05, slow.set).start()
+    try:
+        with pytest.raises(ValueError):
+            pipeline.process(1)
+    finally:
+        pipeline.close()
+    # the sibling finished before process returned, the rest never ran
+    assert ran == ["sibling"]
+
+
+def test_process_after_close_raises():
+    pipeline = Pipeline([Stage("a", add), Stage("b", add, ["a"])])
+    pipeline.close()
+    with pytest.raises(RuntimeError):
+        pipeline.process(1)
@@ -0,0 +1,71 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("zocp")
+
+from sphof.pool import ActorPool, PooledActor
+
+
+class Counter(PooledActor):
+    fps = 100
+
+    def setup(self):
+        self.frames = 0
+        self.threads = set()
+        self.received = []
+        self.register_int("count", 0, "re")
+        self.register_int("count_in", 0, "rs")
+
+    def update(self):
+        self.frames += 1
+        self.threads.add(threading.current_thread().name)
+
+    def on_peer_signaled(self, peer, name, data, *args, **kwargs):
+        self.received.append(data[1])
+
+
+def wait_for(condition, timeout=2):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.005)
+    return condition()
+
+
+@pytest.fixture
+def pool():
+    pool = ActorPool(2)
+    yield pool
+    pool.stop()
+
+
+def test_pool_runs_many_actors(pool):
+    actors = [Counter("Counter{0}".format(i)) for i in range(50)]
+    for actor in actors:
+        pool.add(actor)
+    assert len(pool) == 50
+    assert wait_for(lambda: all(actor.frames >= 3 for actor in actors))
+    assert set().union(*(actor.threads for actor in actors)) <= {"ActorPool-0", "ActorPool-1"}
+
+
+def test_signals_wake_the_receiver(pool):
+    emitter, receiver = Counter("Emitter"), Counter("Receiver")
+    receiver.set_fps(0.1)
+    pool.add(emitter)
+    pool.add(receiver)
+    receiver.signal_subscribe(receiver.uuid(), "count_in", emitter.uuid(), "count")
+    emitter.emit_signal("count", 7)
+    assert wait_for(lambda: receiver.received == [7])
+    assert receiver.get_value("count_in") == 7
+
+
+def test_removed_actors_stop_running(pool):
+    actor = Counter("Removed")
+    pool.add(actor)
+    pool.wake(actor)
+    actor.stop()
+    assert len(pool) == 0 and actor not in pool._ready
+    frames = actor.frames
+    time.sleep(0.05)
+    assert actor.frames <= frames + 1
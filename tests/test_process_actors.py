@@ -0,0 +1,42 @@
+import multiprocessing
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("zocp")
+
+from sphof.canvas_actors import CanvasActor
+from sphof.displays import OffscreenDisplay
+from sphof.process_actors import ProcessPainterActor
+
+
+class OneFrame(ProcessPainterActor):
+
+    def __init__(self, *args, **kwargs):
+        self.handles = kwargs.pop("handles")
+        super(OneFrame, self).__init__(*args, **kwargs)
+
+    def setup(self):
+        self.sent = False
+
+    def update(self):
+        if not self.sent:
+            self.rectangle([10, 10, 20, 20], fill=(255, 0, 0))
+            self.send_img()
+            self.handles.put(self.get_value("imgID"))
+            self.sent = True
+
+
+def test_process_painter_frames_reach_the_canvas():
+    handles = multiprocessing.get_context(ProcessPainterActor.start_method).Queue()
+    painter = OneFrame("OneFrame", handles=handles)
+    canvas = CanvasActor("Canvas", display=OffscreenDisplay())
+    try:
+        handle = handles.get(timeout=30)
+        img = canvas.get_img_from_id(handle)
+        assert img is not None and img.size == (200, 600)
+        assert img.getpixel((15, 15)) == (255, 0, 0)
+        assert img.getpixel((100, 300)) == painter.background_color
+    finally:
+        painter.stop()
+        canvas.stop()
@@ -0,0 +1,61 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("zocp")
+
+from sphof.actors import LeadActor, ReactiveActor
+
+
+class Sleeper(ReactiveActor):
+    # long enough that waking up by the block timeout would fail the tests
+    max_block = 1.0
+
+    def setup(self):
+        self.register_int("in", 0, "rs")
+        self.signaled = threading.Event()
+        self.timed = threading.Event()
+        self.signaled_at = self.timed_at = None
+        self.timer_start = time.monotonic()
+        self.add_timer(0.05, self.on_timer, repeat=False)
+
+    def on_timer(self):
+        self.timed_at = time.monotonic()
+        self.timed.set()
+
+    def on_peer_signaled(self, peer, name, data):
+        self.signaled_at = time.monotonic()
+        self.signaled.set()
+
+
+class Source(LeadActor):
+
+    def setup(self):
+        self.register_int("out", 0, "re")
+
+
+def test_reactive_actor_wakes_on_a_timer():
+    sleeper = Sleeper("Sleeper")
+    try:
+        assert sleeper.timed.wait(sleeper.max_block)
+        assert 0.05 <= sleeper.timed_at - sleeper.timer_start < sleeper.max_block / 2
+    finally:
+        sleeper.stop()
+
+
+def test_reactive_actor_wakes_on_a_signal():
+    source = Source("Source")
+    sleeper = Sleeper("Sleeper")
+    try:
+        source.signal_subscribe(sleeper.uuid(), "in", source.uuid(), "out")
+        # let the loop go back to sleep after the timer
+        assert sleeper.timed.wait(sleeper.max_block)
+        time.sleep(0.1)
+        sent_at = time.monotonic()
+        source.emit_signal("out", 1)
+        assert sleeper.signaled.wait(sleeper.max_block)
+        assert sleeper.signaled_at - sent_at < sleeper.max_block / 2
+    finally:
+        sleeper.stop()
+        source.stop()
@@ -0,0 +1,55 @@
+import time
+import pytest
+from sphof.schedulers import FrameScheduler, UnthrottledScheduler, make_scheduler
+
+
+def test_make_scheduler():
+    assert isinstance(make_scheduler(0), UnthrottledScheduler)
+    assert isinstance(make_scheduler(30), FrameScheduler)
+    with pytest.raises(ValueError):
+        FrameScheduler(30, "sometimes")
+
+
+def test_deadlines_are_on_a_grid():
+    scheduler = FrameScheduler(100.)
+    scheduler.start()
+    start = scheduler.deadline
+    assert scheduler.due()
+    assert scheduler.advance() == 1
+    assert scheduler.deadline == pytest.approx(start + 0.01)
+    assert not scheduler.due()
+    assert 0 < scheduler.timeout() <= 0.01
+
+
+def test_skip_and_catchup():
+    skip = FrameScheduler(100., "skip")
+    catchup = FrameScheduler(100., "catchup", max_catchup=3)
+    for scheduler in (skip, catchup):
+        scheduler.start()
+        scheduler.deadline -= 0.055             # 5 frames behind
+    assert skip.advance() == 1
+    assert skip.missed == 5
+    assert catchup.advance() == 3
+    assert catchup.missed == 3
+    # both continue on the next deadline in the future
+    assert not skip.due() and not catchup.due()
+
+
+def test_replacing_a_started_scheduler():
+    old = make_scheduler(60.)
+    old.start()
+    old.advance()
+    new = make_scheduler(30., previous=old)
+    assert new.deadline is not None
+    assert new.frames == 1
+    new.timeout()
+    new.advance()
+    # replacing a scheduler which isn't started yet leaves it for start()
+    assert make_scheduler(30., previous=make_scheduler(60.)).deadline is None
+
+
+def test_unthrottled():
+    scheduler = UnthrottledScheduler()
+    scheduler.start()
+    assert scheduler.due() and scheduler.timeout() == 0
+    assert scheduler.advance() == 1
@@ -0,0 +1,43 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from sphof import shared_frames
+from sphof.shared_frames import SharedFrameRing, read_frame
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(4 * 4 * 4, slots=2)
+    yield ring
+    shared_frames.close_all()
+    ring.close()
+
+
+def test_read_frame_until_the_ring_wraps(ring):
+    handle = ring.write(Image.new("RGB", (4, 4), "red"))
+    assert read_frame(handle).getpixel((0, 0)) == (255, 0, 0)
+    ring.write(Image.new("RGB", (4, 4), "blue"))
+    ring.write(Image.new("RGB", (4, 4), "blue"))
+    assert read_frame(handle) is None
+
+
+def test_read_frame_copies_by_default(ring):
+    handle = ring.write(Image.new("RGBA", (4, 4), "red"))
+    img = read_frame(handle)
+    view = read_frame(handle, copy=False)
+    ring.write(Image.new("RGBA", (4, 4), "blue"))
+    ring.write(Image.new("RGBA", (4, 4), "blue"))
+    assert img.getpixel((0, 0)) == (255, 0, 0, 255)
+    assert view.getpixel((0, 0)) == (0, 0, 255, 255)
+    del view
+
+
+def test_readers_detach_from_closed_rings():
+    ring = SharedFrameRing(4 * 4 * 3, slots=2)
+    handle = ring.write(Image.new("RGB", (4, 4), "red"))
+    assert read_frame(handle) is not None
+    assert ring.name in shared_frames._rings
+    ring.close()
+    assert read_frame(handle) is None
+    assert ring.name not in shared_frames._rings